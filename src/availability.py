@@ -1,48 +1,133 @@
 """Expert Dashboard rendering engine with strict data integrity checks."""
 
+import hashlib
+import json
 import logging
+import os
+import tempfile
 from datetime import datetime, timedelta
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from dateutil import tz
 from .sheets_client import SheetsClient
-from .booking_manager import BookingManager, Booking
+from .booking_manager import BookingManager, Booking, SlotKey
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
+_TAIWAN_TZ = tz.gettz("Asia/Taipei")
+
+# Last rendered grid + its fingerprint, kept across runs on the same host (one file per
+# spreadsheet and layout). JSON rather than pickle: the temp dir is shared, so never unpickle from it.
+_VIEW_CACHE_DIR = Path(tempfile.gettempdir())
+
+# Padding below the grid (time column + 7 days); rows are shared, the payload is read-only
+_BLANK_ROWS = [[""] * 8] * 30
+
+# Bump when the dashboard formatting below changes so sheets get re-styled
+_LAYOUT_VERSION = "layout-v2"
+# Bookkeeping cells live in column J: right of the A:H grid, outside every formatted
+# range, and hidden by ensure_layout so customers never see them
+_BOOKKEEPING_COL = 9  # J, zero-based
+_LAYOUT_SENTINEL_CELL = "J1"
+# Fingerprint of the grid last written, read back before a write is skipped
+_VIEW_HASH_CELL = "J2"
+# Where layout-v1 kept the two cells, visibly below the grid
+_LEGACY_BOOKKEEPING_RANGE = "A100:B100"
+
 class AvailabilityDashboard:
     def __init__(self, client: SheetsClient, manager: BookingManager):
         self.client = client
         self.manager = manager
         self.settings = get_settings()
         self.sheet_name = self.settings.dashboard_sheet_name
+        self._rng_title = f"'{self.sheet_name}'!A1"
+        self._rng_view = f"'{self.sheet_name}'!A1:H100"
+        self._rng_sentinel = f"'{self.sheet_name}'!{_LAYOUT_SENTINEL_CELL}"
+        self._rng_view_hash = f"'{self.sheet_name}'!{_VIEW_HASH_CELL}"
+        self._view_cache_path = _VIEW_CACHE_DIR / f"dashboard_view_{client.sheet_id}_{_LAYOUT_VERSION}.json"
+        self._cached_view, self._last_view_hash = self._load_view_cache()
+        self._last_stamp: Optional[str] = None
+        # Grid rows are fixed by settings: (hour, court, row label) in display order
+        self._cells_spec: List[Tuple[int, int, str]] = [
+            (h, court, f"Court {court} - {h:02d}:00")
+            for h in range(self.settings.operating_hours_start, self.settings.operating_hours_end)
+            for court in range(1, self.settings.court_count + 1)
+        ]
 
-    def update_dashboard(self):
-        """Force a fresh sync of the visual center."""
+    def update_dashboard(self, bookings: Optional[List[Booking]] = None):
+        """Force a fresh sync of the visual center.
+
+        Args:
+            bookings: Registry snapshot to render; taken from the manager when None.
+                Pass one when running concurrently with registry writes.
+        """
         logger.info("Syncing CEO Dashboard with latest registry data...")
         try:
-            # 1. FORCE REFRESH: Pull latest state from 'Bookings' Sheet
-            all_bookings = self.manager.refresh_cache()
+            # 1. Pull latest state from 'Bookings' Sheet (re-read only if written since last load)
+            try:
+                all_bookings = self.manager.get_all_bookings() if bookings is None else bookings
+            except Exception as e:
+                return self._write_cached_view(e)
             
             # 2. Map data for high-speed lookup
             lookup_map = self._create_lookup_map(all_bookings)
+
+            # 3. Short-circuit: same bookings + same day => grid is identical,
+            #    provided the sheet still holds it (tab cleared or recreated => rewrite)
+            now_taiwan_dt = datetime.now(_TAIWAN_TZ)
+            stamp = now_taiwan_dt.strftime("%Y-%m-%d %H:%M")
+            view_hash = self._view_hash(lookup_map, stamp[:10])
+            if view_hash == self._last_view_hash and self._sheet_has_view(view_hash):
+                if stamp != self._last_stamp:
+                    # Only the 'Updated' timestamp moved: touch the title cell alone
+                    self.client.write_range(self._rng_title, [[self._title(stamp)]])
+                    self._last_stamp = stamp
+                logger.info("✅ Dashboard unchanged; skipped grid rewrite.")
+                return True
+
+            # 4. Generate View
+            view = self._generate_view(lookup_map, now_taiwan_dt)
             
-            # 3. Generate View
-            view = self._generate_view(lookup_map)
-            
-            # 4. Write to Sheet (Atomic operation)
-            self.client.write_range(f"'{self.sheet_name}'!A1:H100", view)
-            
+            # 5. Write to Sheet (Atomic operation), with its fingerprint. Styling lives in ensure_layout().
+            self.client.write_ranges({self._rng_view: view, self._rng_view_hash: [[view_hash]]})
+
+            self._last_stamp = stamp
+            self._last_view_hash = view_hash
+            self._cached_view = view
+            self._save_view_cache(view, view_hash)
+            logger.info("✅ Dashboard updated successfully.")
+            return True
+        except Exception as e:
+            logger.error(f"Critical Dashboard Repair Required: {e}")
+            return False
+
+    def ensure_layout(self) -> bool:
+        """Apply the premium dashboard styling once per layout version.
+
+        The styling calls are idempotent, so they only run when the sentinel
+        cell does not already hold the current version.
+
+        Returns:
+            True if the styling was (re)applied.
+        """
+        current = self.client.read_range(self._rng_sentinel)
+        if current and current[0] and current[0][0] == _LAYOUT_VERSION:
+            return False
+
+        logger.info(f"Applying dashboard layout {_LAYOUT_VERSION}...")
+        with self.client.batched():
             # --- DASHBOARD PREMIUM DECORATION ---
             # 1. Header (A1) & Column Headers (A2:H2)
             self.client.format_cells(self.sheet_name, "A1:H1", bg_color={"red": 0.17, "green": 0.24, "blue": 0.31}, text_color={"red": 1.0, "green": 1.0, "blue": 1.0}, bold=True, font_size=14, horizontal_alignment="CENTER")
             self.client.format_cells(self.sheet_name, "A2:H2", bg_color={"red": 0.9, "green": 0.9, "blue": 0.9}, bold=True, font_size=11, horizontal_alignment="CENTER")
-            
+
             # 2. Dimensions (Mobile Friendly)
             self.client.set_row_height(self.sheet_name, 0, 1, 60) # Title
             self.client.set_row_height(self.sheet_name, 1, 100, 40) # Content rows
             self.client.set_column_width(self.sheet_name, 0, 1, 180) # Time/Court column
             self.client.set_column_width(self.sheet_name, 1, 8, 140) # Date columns
-            
+
             # 3. Conditional Formatting Matrix
             rules = [
                 {"text": "✅ Available", "bg_color": {"red": 0.9, "green": 1.0, "blue": 0.9}, "text_color": {"red": 0.0, "green": 0.5, "blue": 0.0}},
@@ -50,56 +135,92 @@ class AvailabilityDashboard:
             ]
             self.client.add_conditional_formatting(self.sheet_name, "B3:H100", rules)
 
-            logger.info("✅ Dashboard updated successfully (Premium Aesthetics Applied).")
-            return True
-        except Exception as e:
-            logger.error(f"Critical Dashboard Repair Required: {e}")
-            return False
+            # 4. Bookkeeping column out of sight
+            self.client.hide_columns(self.sheet_name, _BOOKKEEPING_COL, _BOOKKEEPING_COL + 1)
+
+        self.client.clear_range(f"'{self.sheet_name}'!{_LEGACY_BOOKKEEPING_RANGE}")
+        self.client.write_range(self._rng_sentinel, [[_LAYOUT_VERSION]])
+        # Re-styled tab (possibly recreated): never skip the next grid write
+        self._last_view_hash = None
+        return True
 
-    def _create_lookup_map(self, bookings: List[Booking]) -> Dict[str, str]:
-        """Creates a high-performance hash map for the generator."""
+    def _sheet_has_view(self, view_hash: str) -> bool:
+        """Whether the fingerprint cell read back from the sheet matches `view_hash`."""
+        current = self.client.read_range(self._rng_view_hash)
+        return bool(current and current[0] and current[0][0] == view_hash)
+
+    def _view_hash(self, lookup: Dict[SlotKey, str], today_str: str) -> str:
+        """Fingerprint everything the grid depends on except the 'Updated' time."""
+        payload = (
+            today_str,
+            self.settings.operating_hours_start,
+            self.settings.operating_hours_end,
+            self.settings.court_count,
+            sorted(lookup.items()),
+        )
+        return hashlib.blake2b(repr(payload).encode(), digest_size=8).hexdigest()
+
+    def _write_cached_view(self, error: Exception) -> bool:
+        """Fallback when the registry cannot be read: re-publish the last rendered grid."""
+        if not self._cached_view:
+            raise error
+        logger.warning(f"Registry unavailable ({error}); re-publishing last rendered dashboard.")
+        self.client.write_range(self._rng_view, self._cached_view)
+        return True
+
+    def _load_view_cache(self) -> Tuple[Optional[List[List[str]]], Optional[str]]:
+        try:
+            data = json.loads(self._view_cache_path.read_text(encoding="utf-8"))
+            return data["view"], data["hash"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+
+    def _save_view_cache(self, view: List[List[str]], view_hash: str):
+        tmp_path = self._view_cache_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps({"hash": view_hash, "view": view}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self._view_cache_path)
+        except OSError as e:
+            logger.warning(f"Could not persist dashboard view: {e}")
+
+    @staticmethod
+    def _title(stamp: str) -> str:
+        return f"📅 Court Availability Dashboard - Updated: {stamp} (Taipei Time)"
+
+    def _create_lookup_map(self, bookings: List[Booking]) -> Dict[SlotKey, str]:
+        """Creates a high-performance hash map for the generator: (date ordinal, hour, court) -> name."""
         lookup = {}
         for b in bookings:
             # Logic: If it's a cancellation, it shouldn't show up as '🔴'
-            if "Booked" in b.status:
-                key = f"{b.date.strftime('%Y-%m-%d')}_{b.time_slot}_{b.court}"
-                lookup[key] = b.customer_name
+            if b.is_booked and b.hour is not None:
+                lookup[(b.date_only.toordinal(), b.hour, b.court)] = b.customer_name
         return lookup
 
-    def _generate_view(self, lookup: Dict[str, str]) -> List[List[str]]:
+    def _generate_view(self, lookup: Dict[SlotKey, str], now_taiwan_dt: Optional[datetime] = None) -> List[List[str]]:
         """Generates the 7-day visual matrix using enterprise settings."""
-        from dateutil import tz
-        taiwan_tz = tz.gettz("Asia/Taipei")
-        now_taiwan_dt = datetime.now(taiwan_tz)
+        if now_taiwan_dt is None:
+            now_taiwan_dt = datetime.now(_TAIWAN_TZ)
         now_taiwan_str = now_taiwan_dt.strftime("%Y-%m-%d %H:%M")
         
         # Start from TODAY in Taiwan time
         start_date = now_taiwan_dt.replace(hour=0, minute=0, second=0, microsecond=0)
         dates = [start_date + timedelta(days=i) for i in range(7)]
+        day_keys = [d.toordinal() for d in dates]
         headers = ["Time Slot & Court"] + [d.strftime("%a %d/%m") for d in dates]
         
         view = [
-            [f"📅 Court Availability Dashboard - Updated: {now_taiwan_str} (Taipei Time)"] + [""] * 7,
+            [self._title(now_taiwan_str)] + [""] * 7,
             headers
         ]
         
-        # Pull constraints from settings for professional alignment
-        start_h = self.settings.operating_hours_start
-        end_h = self.settings.operating_hours_end
-        court_count = self.settings.court_count
-        
-        for h in range(start_h, end_h):
-            time_slot = f"{h:02d}:00"
-            for court in range(1, court_count + 1):
-                row = [f"Court {court} - {time_slot}"]
-                for d in dates:
-                    key = f"{d.strftime('%Y-%m-%d')}_{time_slot}_{court}"
-                    if key in lookup:
-                        row.append(f"🔴 {lookup[key]}")
-                    else:
-                        row.append("✅ Available")
-                view.append(row)
+        # Row layout comes from settings, precomputed once in __init__
+        for h, court, label in self._cells_spec:
+            row = [label]
+            for day in day_keys:
+                key = (day, h, court)
+                row.append(f"🔴 {lookup[key]}" if key in lookup else "✅ Available")
+            view.append(row)
         
         # Padding for a clean CEO UI
-        for _ in range(30): view.append([""] * (len(dates) + 1))
+        view.extend(_BLANK_ROWS)
         return view
@@ -1,15 +1,71 @@
 """Core booking management logic with Lean validation."""
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional
 import logging
+import threading
+import time
+
+from dateutil import parser, tz
 
 from .sheets_client import SheetsClient
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
+_TAIWAN_TZ = tz.gettz("Asia/Taipei")
+
+# (date ordinal, start hour, court): all-int key of a court slot
+SlotKey = tuple[int, int, int]
+
+
+def _slot_hour(time_slot: str) -> int:
+    """Start hour of an 'HH:00' slot label; raises ValueError on malformed labels."""
+    return int(time_slot.split(":", 1)[0])
+
+
+def _slot_key(day: date, hour: int, court: int) -> SlotKey:
+    """Index key of a court slot."""
+    return (day.toordinal(), hour, court)
+
+
+def _try_parse_date(value: str) -> Optional[date]:
+    """'YYYY-MM-DD' date of a sheet cell, or None.
+
+    Zero-padded ISO dates take the fast path; other dashed cells (e.g. '2024-1-5')
+    fall back to strptime. Blank and free-text cells are rejected without raising.
+    """
+    s = str(value).strip()
+    if len(s) == 10 and s[4] == "-" and s[7] == "-":
+        try:
+            return date.fromisoformat(s)
+        except ValueError:  # right shape, impossible date (e.g. month 13)
+            return None
+    if "-" not in s:
+        return None
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _try_parse_timestamp(value: str) -> Optional[datetime]:
+    """'YYYY-MM-DD HH:MM:SS' timestamp of a sheet cell, or None; never raises.
+
+    ISO values take the fast path; unpadded ones (e.g. '2024-01-05 9:05:03')
+    fall back to strptime.
+    """
+    s = str(value).strip()
+    try:
+        return datetime.fromisoformat(s)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
 
 @dataclass
 class Booking:
@@ -22,6 +78,21 @@ class Booking:
     status: str = "🔴 Booked"
     created_at: Optional[datetime] = None
     notes: str = ""
+    # Calendar day of `date`, computed once for day-level comparisons
+    date_only: date = field(init=False, repr=False, compare=False)
+    # Whether `status` marks an active reservation; keep in sync when status changes
+    is_booked: bool = field(init=False, repr=False, compare=False)
+    # Start hour of `time_slot`, for integer slot keys; None for a malformed slot label
+    hour: Optional[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.date_only = self.date.date()
+        self.is_booked = "Booked" in self.status
+        try:
+            self.hour = _slot_hour(self.time_slot)
+        except ValueError:
+            # Still a registry row (listed and archived by date), just never in a slot
+            self.hour = None
 
     def to_row(self) -> List[str]:
         return [
@@ -36,257 +107,528 @@ class Booking:
             self.notes,
         ]
 
+    @staticmethod
+    def _parse_date(value: str) -> datetime:
+        """Day of a registry date cell, as tolerant as the archive; raises ValueError."""
+        day = _try_parse_date(value)
+        if day is None:
+            raise ValueError(f"Unreadable booking date: {value!r}")
+        return datetime(day.year, day.month, day.day)
+
     @classmethod
     def from_row(cls, row: List[str]) -> "Booking":
         return cls(
-            date=datetime.strptime(str(row[0]).strip(), "%Y-%m-%d"),
+            date=cls._parse_date(row[0]),
             time_slot=str(row[1]).strip(),
             court=int(float(row[2])),
             customer_name=str(row[3]).strip(),
             phone=str(row[4]).strip() if len(row) > 4 else "N/A",
             email=str(row[5]).strip() if len(row) > 5 else "N/A",
             status=str(row[6]).strip() if len(row) > 6 else "🔴 Booked",
-            created_at=datetime.strptime(str(row[7]).strip(), "%Y-%m-%d %H:%M:%S") if len(row) > 7 else None,
+            # Informational only: an unreadable timestamp must not drop the booking
+            created_at=_try_parse_timestamp(row[7]) if len(row) > 7 else None,
             notes=str(row[8]).strip() if len(row) > 8 else "",
         )
 
+def _partition_rows(rows: List[List[str]], past: List[bool]) -> tuple[list, list]:
+    """Split non-blank rows into (to_archive, to_keep) by a precomputed per-row flag."""
+    to_archive, to_keep = [], []
+    for row, is_past in zip(rows, past, strict=True):
+        if row and row[0]:
+            (to_archive if is_past else to_keep).append(row)
+    return to_archive, to_keep
+
+
+@dataclass
+class _RegistryBatch:
+    """Registry writes queued by one process_requests run, sent together at its end."""
+    appends: List[int] = field(default_factory=list)  # cache positions of new bookings
+    cancels: List[int] = field(default_factory=list)  # sheet rows to mark cancelled
+
+
+class RequestRow(NamedTuple):
+    """A typed row from the '📥 Booking Requests' sheet."""
+    action: str
+    date: datetime
+    time_slot: str
+    court: int
+    name: str
+    phone: str
+    email: str
+    notes: str
+
+
+def _parse_request_row(row: List[str]) -> RequestRow:
+    """Coerce a raw request row into typed fields; raises ValueError on bad data."""
+    # ROBUST PARSING: Handle potential float/string/empty variations
+    raw_date = str(row[1]).strip()
+    raw_time = str(row[2]).strip()
+    raw_court = str(row[3]).strip()
+
+    # 1. Date Parsing
+    try:
+        date_obj = datetime.fromisoformat(raw_date)
+    except ValueError:
+        # Fallback for common spreadsheet formats
+        date_obj = parser.parse(raw_date)
+
+    # 2. Time Parsing (Handle Google Sheets time decimals)
+    if ":" not in raw_time:
+        try:
+            # If it's a float duration (e.g. 0.5 for 12:00)
+            hours = float(raw_time) * 24
+            time_str = f"{int(hours):02d}:00"
+        except ValueError:
+            time_str = f"{raw_time}:00"
+    else:
+        time_str = raw_time
+
+    return RequestRow(
+        action=str(row[0]).upper(),
+        date=date_obj,
+        time_slot=time_str,
+        # 3. Court Parsing
+        court=int(float(raw_court)),
+        name=str(row[4]).strip(),
+        phone=str(row[5]) if len(row) > 5 else "N/A",
+        email=str(row[6]) if len(row) > 6 else "N/A",
+        notes=str(row[7]) if len(row) > 7 else "",
+    )
+
+
 class BookingManager:
     def __init__(self, sheets_client: SheetsClient):
         self.client = sheets_client
-        self.sheet_name = settings.bookings_sheet_name
-        self._cached_bookings = []
-
-    def refresh_cache(self):
-        """Fetch rows and update local memory."""
-        range_name = f"'{self.sheet_name}'!A2:I"
-        rows = self.client.read_range(range_name)
-        self._cached_bookings = []
-        for row in rows:
+        self.settings = get_settings()
+        self.sheet_name = self.settings.bookings_sheet_name
+        self._rng_registry = f"'{self.sheet_name}'!A2:I"
+        self._rng_registry_append = f"'{self.sheet_name}'!A:I"
+        self._rng_requests = f"'{self.settings.requests_sheet_name}'!A2:I"
+        self._cached_bookings: List[Booking] = []
+        # Raw registry rows behind the cache (index = sheet row - 2), kept in step with our writes
+        self._registry_rows: List[List[str]] = []
+        # Sheet row of each cached booking (parallel to _cached_bookings; blank rows are skipped).
+        # None for a booking queued in the current batch and not yet appended.
+        self._row_numbers: List[Optional[int]] = []
+        # (date ordinal, time slot, court) -> cache positions of the active bookings in that slot
+        self._booked_slots: Dict[SlotKey, List[int]] = {}
+        # True until the first load and after a write the cache cannot mirror (archive rewrite)
+        self._cache_dirty = True
+        # monotonic time of the last registry load; older caches are re-read to catch manual edits
+        self._cache_loaded_at = 0.0
+        # Streamlit shares one manager across sessions (cache_resource): cache reloads,
+        # bookings and request batches run one at a time
+        self._lock = threading.RLock()
+        # Column-oriented copy of the cache for the UI; None until requested or after any change
+        self._bookings_df = None
+
+    def refresh_cache(self, pre_rows: Optional[List[List[str]]] = None, force: bool = False):
+        """Fetch rows and update local memory.
+
+        A no-op while the cache is clean, unless rows are supplied or force is set.
+
+        Args:
+            pre_rows: Registry rows already fetched by the caller (e.g. via batchGet).
+            force: Re-read even if nothing was written, e.g. to pick up manual sheet edits.
+        """
+        with self._lock:
+            return self._refresh_cache(pre_rows, force)
+
+    def _refresh_cache(self, pre_rows: Optional[List[List[str]]], force: bool) -> List[Booking]:
+        if pre_rows is None:
+            fresh = time.monotonic() - self._cache_loaded_at < self.settings.cache_ttl_seconds
+            if fresh and not (self._cache_dirty or force):
+                return self._cached_bookings
+            # A forced re-read must also see other writers: skip the client's read cache
+            pre_rows = self.client.read_range(self._rng_registry, fresh=force)
+        rows = pre_rows
+        # Own list: our writes are mirrored into it, and the client may share `rows`
+        self._registry_rows = list(rows)
+        # Fill pre-sized buffers by index, then trim the rows that did not parse
+        bookings: list = [None] * len(rows)
+        row_numbers: list = [None] * len(rows)
+        j = 0
+        for row_num, row in enumerate(rows, start=2):
             if len(row) >= 4 and row[0]:
                 try:
-                    self._cached_bookings.append(Booking.from_row(row))
+                    bookings[j] = Booking.from_row(row)
                 except Exception:
                     continue
+                row_numbers[j] = row_num
+                j += 1
+        del bookings[j:], row_numbers[j:]
+        self._cached_bookings = bookings
+        self._row_numbers = row_numbers
+        self._bookings_df = None
+        self._booked_slots = {}
+        for pos in range(j):
+            self._index_booking(pos)
+        self._cache_dirty = False
+        self._cache_loaded_at = time.monotonic()
         return self._cached_bookings
 
+    def _put_registry_row(self, row_num: int, row: List[str]):
+        """Mirror a row we wrote to the registry into the raw rows behind the cache."""
+        idx = row_num - 2
+        if idx >= len(self._registry_rows):
+            self._registry_rows.extend([] for _ in range(idx + 1 - len(self._registry_rows)))
+        self._registry_rows[idx] = row
+
+    def _index_booking(self, pos: int):
+        """Record the cached booking at `pos` in the slot index if it is active."""
+        booking = self._cached_bookings[pos]
+        if booking.is_booked and booking.hour is not None:
+            key = _slot_key(booking.date_only, booking.hour, booking.court)
+            self._booked_slots.setdefault(key, []).append(pos)
+
+    def _add_to_cache(self, booking: Booking, row_num: Optional[int]):
+        """Append a booking to the cache and index it if active."""
+        self._cached_bookings.append(booking)
+        self._row_numbers.append(row_num)
+        self._bookings_df = None
+        self._index_booking(len(self._cached_bookings) - 1)
+
     def get_all_bookings(self) -> List[Booking]:
-        """Compatibility method for Availability Dashboard."""
-        if not self._cached_bookings:
-            return self.refresh_cache()
-        return self._cached_bookings
+        """Return cached bookings, re-reading the registry only when dirty or past the TTL."""
+        return self.refresh_cache()
+
+    def get_bookings_df(self):
+        """Return the cached bookings as a pandas DataFrame, one column per field.
+
+        Rebuilt only after the cache changes. Columns: date (datetime64, day),
+        time_slot (category), court (int16), customer_name, phone, email,
+        status (category), notes, is_booked (bool). Requires pandas.
+        """
+        with self._lock:
+            bookings = self.refresh_cache()
+            if self._bookings_df is None:
+                import pandas as pd
+
+                self._bookings_df = pd.DataFrame({
+                    "date": pd.to_datetime([b.date_only for b in bookings]),
+                    "time_slot": pd.Categorical([b.time_slot for b in bookings]),
+                    "court": pd.array([b.court for b in bookings], dtype="int16"),
+                    "customer_name": [b.customer_name for b in bookings],
+                    "phone": [b.phone for b in bookings],
+                    "email": [b.email for b in bookings],
+                    "status": pd.Categorical([b.status for b in bookings]),
+                    "notes": [b.notes for b in bookings],
+                    "is_booked": pd.array([b.is_booked for b in bookings], dtype="bool"),
+                })
+            return self._bookings_df
 
     def check_availability(self, date: datetime, time_slot: str, court: int) -> bool:
         """Atomic check against local cache."""
-        for b in self._cached_bookings:
-            if (b.date.date() == date.date() and 
-                b.time_slot == time_slot and 
-                b.court == court and 
-                "Booked" in b.status):
-                return False
-        return True
-
-    def create_booking(self, booking: Booking) -> tuple[bool, str, Optional[int]]:
-        if not self.check_availability(booking.date, booking.time_slot, booking.court):
-            return False, "ALREADY RESERVED", None
-        
-        try:
-            row_num = self.client.append_row(f"'{self.sheet_name}'!A:I", booking.to_row())
-            self._cached_bookings.append(booking)
-            return True, "BOOKED", row_num
-        except Exception as e:
-            return False, f"DB ERROR: {str(e)}", None
+        return _slot_key(date, _slot_hour(time_slot), court) not in self._booked_slots
+
+    def create_booking(self, booking: Booking, batch: Optional[_RegistryBatch] = None) -> tuple[bool, str, Optional[int]]:
+        """Book a slot.
+
+        Args:
+            batch: Queue the registry append here instead of writing now (process_requests).
+        """
+        with self._lock:
+            if batch is None:
+                # Other writers (form, bot, manual edits) may have taken the slot since the last load
+                self.refresh_cache(force=True)
+            if not self.check_availability(booking.date, booking.time_slot, booking.court):
+                return False, "ALREADY RESERVED", None
+
+            if batch is not None:
+                # Batched: reserve the slot in the cache now, append with the rest of the batch
+                self._add_to_cache(booking, None)
+                batch.appends.append(len(self._cached_bookings) - 1)
+                return True, "BOOKED", None
 
-    def cancel_booking(self, date: datetime, time_slot: str, court: int, name: str) -> tuple[bool, str]:
-        self.refresh_cache()
-        target_date = date.date()
-        target_name = str(name).lower().strip()
-        
-        for i, b in enumerate(self._cached_bookings):
-            if (b.date.date() == target_date and 
-                b.time_slot == str(time_slot).strip() and 
-                b.court == int(float(court)) and 
-                b.customer_name.lower().strip() == target_name and
-                "Booked" in b.status):
-                
-                row_idx = i + 2
-                self.client.update_cell(self.sheet_name, row_idx, 7, "⚪ Cancelled")
-                return True, "RELEASED"
-        return False, "BOOKING NOT FOUND"
+            try:
+                row = booking.to_row()
+                row_num = self.client.append_row(self._rng_registry_append, row)
+                # The cache mirrors the append, so no re-read is needed
+                self._add_to_cache(booking, row_num)
+                self._put_registry_row(row_num, row)
+                return True, "BOOKED", row_num
+            except Exception as e:
+                return False, f"DB ERROR: {str(e)}", None
+
+    def cancel_booking(self, date: datetime, time_slot: str, court: int, name: str,
+                       batch: Optional[_RegistryBatch] = None) -> tuple[bool, str]:
+        """Release the active booking of `name` in a slot.
+
+        Args:
+            batch: Queue the status write here instead of writing now (process_requests).
+        """
+        with self._lock:
+            if batch is None:
+                self.refresh_cache(force=True)  # the booking may have been added by another writer
+            key = _slot_key(date, _slot_hour(str(time_slot).strip()), int(float(court)))
+            target_name = str(name).lower().strip()
+
+            # Only the active bookings of this slot are candidates
+            positions = self._booked_slots.get(key, [])
+            for pos in positions:
+                b = self._cached_bookings[pos]
+                if b.customer_name.lower().strip() == target_name:
+                    row_num = self._row_numbers[pos]
+                    if batch is None:
+                        self.client.update_cell(self.sheet_name, row_num, 7, "⚪ Cancelled")
+                    elif row_num is not None:
+                        batch.cancels.append(row_num)
+                    # else: booked earlier in this batch, so the appended row carries the new status
+                    b.status = "⚪ Cancelled"
+                    b.is_booked = False
+                    self._bookings_df = None
+                    if row_num is not None:
+                        raw = list(self._registry_rows[row_num - 2])
+                        raw.extend([""] * (7 - len(raw)))
+                        raw[6] = b.status
+                        self._put_registry_row(row_num, raw)
+                    positions.remove(pos)
+                    if not positions:
+                        del self._booked_slots[key]
+                    return True, "RELEASED"
+            return False, "BOOKING NOT FOUND"
+
+    def _flush_pending_writes(self, batch: _RegistryBatch) -> Dict[str, Exception]:
+        """Send queued registry writes: one batchUpdate for cancellations, one append for bookings.
+
+        The two calls are independent: one failing does not stop the other.
+
+        Returns:
+            The error of each call that failed, keyed "cancels" or "appends".
+        """
+        failed: Dict[str, Exception] = {}
+        if batch.cancels:
+            try:
+                self.client.write_ranges({f"'{self.sheet_name}'!G{row}": [["⚪ Cancelled"]] for row in batch.cancels})
+            except Exception as e:
+                failed["cancels"] = e
+        if batch.appends:
+            try:
+                rows = [self._cached_bookings[pos].to_row() for pos in batch.appends]
+                first_row = self.client.append_rows(self._rng_registry_append, rows)
+                for offset, (pos, row) in enumerate(zip(batch.appends, rows, strict=True)):
+                    self._row_numbers[pos] = first_row + offset
+                    self._put_registry_row(first_row + offset, row)
+            except Exception as e:
+                failed["appends"] = e
+        if failed:
+            # The cache shows writes the sheet does not have: re-read it next time
+            self._cache_dirty = True
+        return failed
 
     def find_conflicts(self) -> List[str]:
         """Identify overbooked slots in the current registry."""
         conflicts = []
-        schedule = {}
-        
-        for b in self._cached_bookings:
-            if "Booked" in b.status:
-                key = f"{b.date.strftime('%Y-%m-%d')}_{b.time_slot}_{b.court}"
-                if key in schedule:
-                    conflicts.append(f"Conflict on {key}: {schedule[key]} and {b.customer_name}")
-                else:
-                    schedule[key] = b.customer_name
+        # The slot index already groups active bookings: only slots holding 2+ are conflicts
+        for positions in self._booked_slots.values():
+            if len(positions) < 2:
+                continue
+            first, *others = (self._cached_bookings[pos] for pos in positions)
+            key = f"{first.date.strftime('%Y-%m-%d')}_{first.time_slot}_{first.court}"
+            for b in others:
+                conflicts.append(f"Conflict on {key}: {first.customer_name} and {b.customer_name}")
         return conflicts
 
-    def process_requests(self) -> int:
-        """Process pending requests from the '📥 Booking Requests' sheet."""
-        logger.info(f"Scanning '{settings.requests_sheet_name}' for new transactions...")
+    def sync_all(self) -> int:
+        """Re-read the registry and the requests sheet in one batchGet, then process requests.
+
+        Picks up manual edits to the registry. The request writes go out batched
+        as in process_requests.
+
+        Returns:
+            Number of requests processed.
+        """
+        with self._lock:
+            data = self.client.read_ranges([self._rng_registry, self._rng_requests])
+            return self.process_requests(rows=data[self._rng_requests], registry_rows=data[self._rng_registry])
+
+    def process_requests(self, rows: Optional[List[List[str]]] = None,
+                         registry_rows: Optional[List[List[str]]] = None) -> int:
+        """Process pending requests from the '📥 Booking Requests' sheet.
+
+        Args:
+            rows: Request rows already fetched by the caller; read from the sheet when None.
+            registry_rows: Registry rows fetched together with `rows`; the registry is
+                re-read when None (availability is never checked against a TTL-aged cache).
+        """
+        with self._lock:
+            return self._process_requests(rows, registry_rows)
+
+    def _process_requests(self, rows: Optional[List[List[str]]],
+                          registry_rows: Optional[List[List[str]]]) -> int:
+        logger.info(f"Scanning '{self.settings.requests_sheet_name}' for new transactions...")
         
         # 1. Fetch data from requests sheet
         # Format: [ACTION, Date, Time, Court, Name, Phone, Email, Notes, BOOKING_STATUS]
-        range_name = f"'{settings.requests_sheet_name}'!A2:I"
-        rows = self.client.read_range(range_name)
+        if rows is None:
+            rows = self.client.read_range(self._rng_requests)
+        if registry_rows is not None:
+            # Loaded with the requests: use them even when there is nothing to process
+            self.refresh_cache(pre_rows=registry_rows)
         
         if not rows:
             logger.info("No requests found to process.")
             return 0
 
+        if registry_rows is None:
+            # Availability is checked against the cache: make sure it reflects the registry
+            self.refresh_cache(force=True)
+
+        # Skip already processed rows up front: one pass over the status column
+        statuses = [str(r[8]) if len(r) >= 9 else "" for r in rows]
+        pending = [i for i, status in enumerate(statuses) if "✅" not in status]
+
         processed_count = 0
-        for i, row in enumerate(rows):
+        # Collect (row_idx, status) pairs locally and flush them in a single write
+        status_updates: List[tuple[int, str]] = []
+        # Registry writes are queued too; (index into status_updates, batch call it depends on)
+        batch = _RegistryBatch()
+        staged: List[tuple[int, str]] = []
+        for i in pending:
+            row = rows[i]
             row_idx = i + 2  # A2 is index 0
             if not row or not row[0]: continue
 
-            action = str(row[0]).upper()
-            status = str(row[8]) if len(row) >= 9 else ""
-            
-            # Skip already processed rows
-            if "✅" in status: continue
-
             # FEEDBACK LOGIC: Provide status for incomplete rows
             if len(row) < 5 or not str(row[4]).strip(): 
                 logger.warning(f"Row {row_idx} is missing required data (Name).")
-                self.client.update_cell(settings.requests_sheet_name, row_idx, 9, "❌ MISSING NAME")
+                status_updates.append((row_idx, "❌ MISSING NAME"))
                 continue
             
             try:
-                # ROBUST PARSING: Handle potential float/string/empty variations
-                raw_date = str(row[1]).strip()
-                raw_time = str(row[2]).strip()
-                raw_court = str(row[3]).strip()
-                name_attr = str(row[4]).strip()
+                req = _parse_request_row(row)
+                queued_cancels = len(batch.cancels)
 
-                # 1. Date Parsing
-                try:
-                    date_obj = datetime.strptime(raw_date, "%Y-%m-%d")
-                except ValueError:
-                    # Fallback for common spreadsheet formats
-                    from dateutil import parser
-                    date_obj = parser.parse(raw_date)
-
-                # 2. Time Parsing (Handle Google Sheets time decimals)
-                if ":" not in raw_time:
-                    try:
-                        # If it's a float duration (e.g. 0.5 for 12:00)
-                        hours = float(raw_time) * 24
-                        time_str = f"{int(hours):02d}:00"
-                    except ValueError:
-                        time_str = f"{raw_time}:00"
-                else:
-                    time_str = raw_time
-
-                # 3. Court Parsing
-                court_num = int(float(raw_court))
-
-                if "BOOK" in action or "🆕" in action:
+                if "BOOK" in req.action or "🆕" in req.action:
                     new_booking = Booking(
-                        date=date_obj,
-                        time_slot=time_str,
-                        court=court_num,
-                        customer_name=name_attr,
-                        phone=str(row[5]) if len(row) > 5 else "N/A",
-                        email=str(row[6]) if len(row) > 6 else "N/A",
-                        notes=str(row[7]) if len(row) > 7 else ""
+                        date=req.date,
+                        time_slot=req.time_slot,
+                        court=req.court,
+                        customer_name=req.name,
+                        phone=req.phone,
+                        email=req.email,
+                        notes=req.notes
                     )
-                    success, msg, _ = self.create_booking(new_booking)
+                    # The slot index includes bookings queued earlier in this batch
+                    success, msg, _ = self.create_booking(new_booking, batch)
                     final_status = f"✅ BOOKED" if success else f"❌ {msg}"
                 
-                elif "CANCEL" in action or "🚫" in action:
-                    success, msg = self.cancel_booking(date_obj, time_str, court_num, name_attr)
+                elif "CANCEL" in req.action or "🚫" in req.action:
+                    success, msg = self.cancel_booking(req.date, req.time_slot, req.court, req.name, batch)
                     final_status = f"✅ CANCELLED" if success else f"❌ {msg}"
                 
                 else:
                     final_status = "❌ UNKNOWN ACTION"
                     success = False
 
-                # Update row status in sheet
-                self.client.update_cell(settings.requests_sheet_name, row_idx, 9, final_status)
-                if success: processed_count += 1
+                # Stage row status for the batched write
+                status_updates.append((row_idx, final_status))
+                if success:
+                    processed_count += 1
+                    # A cancel of a booking queued in this batch rides on the append instead
+                    depends_on = "cancels" if len(batch.cancels) > queued_cancels else "appends"
+                    staged.append((len(status_updates) - 1, depends_on))
 
             except Exception as e:
                 logger.error(f"Error processing row {row_idx}: {e}")
-                self.client.update_cell(settings.requests_sheet_name, row_idx, 9, f"❌ DATA ERROR")
-
+                status_updates.append((row_idx, "❌ DATA ERROR"))
+
+        # Two registry calls for the whole batch instead of one per request
+        failed = self._flush_pending_writes(batch)
+        for call, e in failed.items():
+            logger.error(f"Registry write failed ({call}): {e}")
+        # Relabel only the requests whose own write did not go through
+        for k, depends_on in staged:
+            if depends_on in failed:
+                status_updates[k] = (status_updates[k][0], f"❌ DB ERROR: {failed[depends_on]}")
+                processed_count -= 1
+
+        # One API call for the touched span of the status column instead of one per row
+        if status_updates:
+            status_updates.sort()
+            first_row, last_row = status_updates[0][0], status_updates[-1][0]
+            column = [[status] for status in statuses[first_row - 2:last_row - 1]]
+            for row_idx, status in status_updates:
+                column[row_idx - first_row] = [status]
+            self.client.update_column(self.settings.requests_sheet_name, "I", first_row, column)
         return processed_count
 
     def archive_old_data(self) -> int:
         """Global Purge: Move past-date data from Registry and Requests to Archive."""
+        with self._lock:
+            return self._archive_old_data()
+
+    def _archive_old_data(self) -> int:
         archive_tab = "📜 Archive"
-        self.client.ensure_sheets_exist([archive_tab])
+        self.client.ensure_sheets_exist([archive_tab], optimistic=True)
         
-        from dateutil import tz
-        taiwan_tz = tz.gettz("Asia/Taipei")
-        today = datetime.now(taiwan_tz).date()
+        today = datetime.now(_TAIWAN_TZ).date()
         total_archived = 0
 
+        # Requests and the archive's fill level in one batchGet
+        rng_archive_col = f"'{archive_tab}'!A:A"
+        data = self.client.read_ranges([self._rng_requests, rng_archive_col])
+        next_archive_row = len(data[rng_archive_col]) + 1
+
         # --- PHASE 1: Purge '📥 Booking Requests' ---
-        logger.info(f"Phase 1: Purging {settings.requests_sheet_name}...")
-        rows = self.client.read_range(f"'{settings.requests_sheet_name}'!A2:I")
+        logger.info(f"Phase 1: Purging {self.settings.requests_sheet_name}...")
+        rows = data[self._rng_requests]
         if rows:
-            to_archive, to_keep = [], []
+            # Past-dated requests go, whatever their status; unparsable dates are kept
+            past = []
             for row in rows:
-                if not row or not row[0]: continue
-                status = str(row[8]) if len(row) >= 9 else ""
-                try:
-                    req_date = datetime.strptime(str(row[1]).strip(), "%Y-%m-%d").date()
-                except:
-                    req_date = today
-
-                is_past = req_date < today
-                is_success = "✅" in status
-                
-                if is_past or (is_success and is_past):
-                    to_archive.append(row)
-                else:
-                    to_keep.append(row)
+                req_date = _try_parse_date(row[1]) if len(row) > 1 else None
+                past.append(req_date is not None and req_date < today)
+            to_archive, to_keep = _partition_rows(rows, past)
 
             if to_archive:
-                self._batch_archive(archive_tab, to_archive)
-                self.client.clear_range(f"'{settings.requests_sheet_name}'!A2:J500")
+                next_archive_row = self._batch_archive(archive_tab, to_archive, next_archive_row)
+                self.client.clear_range(f"'{self.settings.requests_sheet_name}'!A2:J500")
                 if to_keep:
-                    self.client.write_range(f"'{settings.requests_sheet_name}'!A2:I{len(to_keep) + 1}", to_keep)
+                    self.client.write_range(f"'{self.settings.requests_sheet_name}'!A2:I{len(to_keep) + 1}", to_keep)
                 total_archived += len(to_archive)
 
         # --- PHASE 2: Purge 'Bookings' Registry ---
-        logger.info(f"Phase 2: Purging {settings.bookings_sheet_name} Registry...")
-        bookings = self.client.read_range(f"'{settings.bookings_sheet_name}'!A2:I")
+        logger.info(f"Phase 2: Purging {self.settings.bookings_sheet_name} Registry...")
+        # The registry is cleared and rewritten below: partition a fresh read, never an
+        # aged cache, or bookings added since by other writers would be lost
+        self.refresh_cache(force=True)
+        bookings = self._registry_rows
         if bookings:
-            to_archive_b, to_keep_b = [], []
-            for b_row in bookings:
-                if not b_row or not b_row[0]: continue
-                try:
-                    b_date = datetime.strptime(str(b_row[0]).strip(), "%Y-%m-%d").date()
-                except:
-                    b_date = today
-                
-                if b_date < today:
-                    to_archive_b.append(b_row)
-                else:
-                    to_keep_b.append(b_row)
+            # By the raw date cell, as for requests: rows the cache could not parse still move
+            past = []
+            for row in bookings:
+                row_date = _try_parse_date(row[0]) if row else None
+                past.append(row_date is not None and row_date < today)
+            to_archive_b, to_keep_b = _partition_rows(bookings, past)
 
             if to_archive_b:
-                self._batch_archive(archive_tab, to_archive_b)
-                self.client.clear_range(f"'{settings.bookings_sheet_name}'!A2:I2000")
+                self._batch_archive(archive_tab, to_archive_b, next_archive_row)
+                self.client.clear_range(f"'{self.settings.bookings_sheet_name}'!A2:I2000")
                 if to_keep_b:
-                    self.client.write_range(f"'{settings.bookings_sheet_name}'!A2:I{len(to_keep_b) + 1}", to_keep_b)
+                    self.client.write_range(f"'{self.settings.bookings_sheet_name}'!A2:I{len(to_keep_b) + 1}", to_keep_b)
                 total_archived += len(to_archive_b)
+                # Registry rows moved: cached row positions are stale
+                self._cache_dirty = True
 
         return total_archived
 
-    def _batch_archive(self, archive_tab: str, rows: list):
-        """Helper to batch write rows into Archive."""
+    def _batch_archive(self, archive_tab: str, rows: list, next_row: Optional[int] = None) -> Optional[int]:
+        """Helper to batch write rows into Archive.
+
+        Args:
+            next_row: First free archive row when already known; looked up when None.
+
+        Returns:
+            The next free archive row, or None if it is unknown (after the append fallback).
+        """
         try:
-            archive_rows = self.client.read_range(f"'{archive_tab}'!A:A")
-            next_row = len(archive_rows) + 1
+            if next_row is None:
+                archive_rows = self.client.read_range(f"'{archive_tab}'!A:A")
+                next_row = len(archive_rows) + 1
             self.client.write_range(f"'{archive_tab}'!A{next_row}:I{next_row + len(rows) - 1}", rows)
+            return next_row + len(rows)
         except Exception as e:
             logger.error(f"Batch archive failed: {e}")
-            for row in rows: self.client.append_row(f"'{archive_tab}'!A:I", row)
+            self.client.append_rows(f"'{archive_tab}'!A:I", rows)
+            return None
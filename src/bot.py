@@ -0,0 +1,180 @@
+"""Unified sync bot: sheet standardization, request processing, archive and dashboard."""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from functools import lru_cache
+from .config import get_settings
+from .sheets_client import SheetsClient
+from .booking_manager import BookingManager
+from .availability import AvailabilityDashboard
+
+logger = logging.getLogger("BookingBot")
+
+BOOKINGS_HEADERS = [["Date", "Time Slot", "Court", "Customer Name", "Phone", "Email", "Status", "Created At", "Notes"]]
+REQUESTS_HEADERS = [["ACTION", "Date", "Time", "Court", "Name", "Phone", "Email", "Notes", "BOOKING_STATUS"]]
+
+# Data-validation rows: cover what is in use plus room for new requests, never fewer than the floor
+_DROPDOWN_MIN_ROWS = 50
+_DROPDOWN_SPARE_ROWS = 20
+# Last row of the fixed-size dropdowns older versions validated (A2:D300)
+_LEGACY_DROPDOWN_END = 300
+
+def dropdown_end_row(used_rows):
+    """Last sheet row (1-based) that should carry the request dropdowns."""
+    return max(_DROPDOWN_MIN_ROWS, used_rows + 1 + _DROPDOWN_SPARE_ROWS)
+
+@lru_cache(maxsize=1)
+def _dropdown_dates(today_iso):
+    """Next 14 booking dates; recomputed only when the day rolls over."""
+    today = date.fromisoformat(today_iso)
+    return [(today + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(14)]
+
+@lru_cache(maxsize=1)
+def _dropdown_slots(start_h, end_h, court_count):
+    """Time and court options; depend on settings only."""
+    times = [f"{h:02d}:00" for h in range(start_h, end_h)]
+    courts = [str(c) for c in range(1, court_count + 1)]
+    return times, courts
+
+class CourtBookingBot:
+    def __init__(self):
+        self.settings = get_settings()
+        self.client = SheetsClient(
+            credentials_path=self.settings.google_credentials_path,
+            sheet_id=self.settings.sheet_id
+        )
+        self.manager = BookingManager(self.client)
+        self.dashboard = AvailabilityDashboard(self.client, self.manager)
+        # A1 ranges are fixed for the session: build them once
+        self._rng_bookings_hdr = f"'{self.settings.bookings_sheet_name}'!A1:I1"
+        self._rng_requests_hdr = f"'{self.settings.requests_sheet_name}'!A1:I1"
+        self._rng_bookings_data = f"'{self.settings.bookings_sheet_name}'!A2:I"
+        self._rng_requests_data = f"'{self.settings.requests_sheet_name}'!A2:I"
+        self._dropdown_end = 1  # last row currently carrying dropdowns
+        self._required_tabs = [
+            self.settings.bookings_sheet_name,
+            self.settings.dashboard_sheet_name,
+            self.settings.requests_sheet_name
+        ]
+
+    def set_request_dropdowns(self, first_row, last_row):
+        """Queue the ACTION/Date/Time/Court validations for rows first_row..last_row."""
+        dates = _dropdown_dates(date.today().isoformat())
+        times, courts = _dropdown_slots(self.settings.operating_hours_start, self.settings.operating_hours_end, self.settings.court_count)
+        actions = ["🆕 BOOKING", "🚫 CANCEL"]
+        self.client.set_dropdowns(self.settings.requests_sheet_name, [
+            (f"{col}{first_row}:{col}{last_row}", options)
+            for col, options in (("A", actions), ("B", dates), ("C", times), ("D", courts))
+        ])
+        if first_row == 2 and last_row < _LEGACY_DROPDOWN_END:
+            # Full setup pass: drop stale rules (old 14-day date lists reject today) below the range
+            self.client.clear_data_validation(self.settings.requests_sheet_name, f"A{last_row + 1}:D{_LEGACY_DROPDOWN_END}")
+        self._dropdown_end = max(self._dropdown_end, last_row)
+
+    def ensure_dropdown_rows(self, used_rows):
+        """Extend the dropdowns when the requests sheet outgrew the validated range."""
+        end_row = dropdown_end_row(used_rows)
+        if end_row <= self._dropdown_end:
+            return
+        logger.info(f"Extending request dropdowns to row {end_row}...")
+        with self.client.batched():
+            self.set_request_dropdowns(self._dropdown_end + 1, end_row)
+
+    def initialize_sheet_structure(self, used_rows=0):
+        """Standardize Lean Facility Interface.
+
+        Args:
+            used_rows: Data rows already in the requests sheet; sizes the dropdown range.
+        """
+        logger.info("Initializing Lean Facility Workspace...")
+        try:
+            # 1. Main Tabs
+            self.client.ensure_sheets_exist(self._required_tabs)
+            
+            # 2-4. Junk cleanup + header rows touch disjoint tabs/ranges: run them concurrently
+            tasks = [
+                lambda name=trash: self.client.delete_sheet_by_name(name)
+                for trash in ["⚙️ System Data", "⏳ Waiting List", "📁 Booking Archive", "🚫 Cancel My Booking", "Sheet1"]
+            ]
+            tasks.append(lambda: self.client.write_range(self._rng_bookings_hdr, BOOKINGS_HEADERS))
+            tasks.append(lambda: self.client.write_range(self._rng_requests_hdr, REQUESTS_HEADERS))
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                for future in as_completed([pool.submit(task) for task in tasks]):
+                    future.result()
+            
+            # 5. UI Controls + decoration: queued and sent as ONE batchUpdate
+            with self.client.batched():
+                self.set_request_dropdowns(2, dropdown_end_row(used_rows))
+
+                # --- PREMIUM DECORATION (Mobile Friendly) ---
+                req_sheet = self.settings.requests_sheet_name
+                # 1. Header Styling
+                header_bg = {"red": 0.17, "green": 0.24, "blue": 0.31} # Dark Blue/Grey
+                header_text = {"red": 1.0, "green": 1.0, "blue": 1.0}
+                self.client.format_cells(req_sheet, "A1:I1", bg_color=header_bg, text_color=header_text, bold=True, font_size=12, horizontal_alignment="CENTER")
+
+                # 2. Touch-Friendly Rows (Larger selection area)
+                self.client.set_row_height(req_sheet, 0, 300, 45)
+                self.client.set_column_width(req_sheet, 0, 9, 120) # Standard width
+                self.client.set_column_width(req_sheet, 8, 9, 200) # Status Notes wider
+
+                # 3. Conditional Color Branding
+                rules = [
+                    {"text": "🆕 BOOKING", "bg_color": {"red": 0.82, "green": 0.94, "blue": 0.85}, "text_color": {"red": 0.1, "green": 0.4, "blue": 0.1}},
+                    {"text": "🚫 CANCEL", "bg_color": {"red": 0.98, "green": 0.85, "blue": 0.85}, "text_color": {"red": 0.6, "green": 0.1, "blue": 0.1}},
+                    {"text": "✅", "bg_color": {"red": 0.8, "green": 1.0, "blue": 0.8}},
+                    {"text": "❌", "bg_color": {"red": 1.0, "green": 0.8, "blue": 0.8}},
+                    {"text": "DONE", "bg_color": {"red": 0.85, "green": 1.0, "blue": 0.85}},
+                    {"text": "ERROR", "bg_color": {"red": 1.0, "green": 0.85, "blue": 0.85}}
+                ]
+                self.client.add_conditional_formatting(req_sheet, "A2:A300", rules[:2]) # Actions
+                self.client.add_conditional_formatting(req_sheet, "I2:I300", rules[2:]) # Status
+
+            # 6. Dashboard styling (skipped when the layout version is current)
+            self.dashboard.ensure_layout()
+
+            logger.info("✅ Workspace is standardized with Premium UI.")
+        except Exception as e:
+            logger.error(f"Setup Warning: {e}")
+
+    def preload(self):
+        """Fetch the requests sheet and the registry in ONE batchGet round-trip."""
+        data = self.client.read_ranges([self._rng_requests_data, self._rng_bookings_data])
+        return data[self._rng_requests_data], data[self._rng_bookings_data]
+
+    def process_unified_requests(self, rows=None, registry_rows=None):
+        """Atomic Transaction Processing using centralized manager logic."""
+        return self.manager.process_requests(rows, registry_rows)
+
+    def run(self):
+        print("\n" + "="*40)
+        print("EXECUTIVE FACILITY SYNC: ACTIVE")
+        print("="*40)
+        try:
+            # 1. Load requests + registry in one round-trip (tabs first, so the read cannot miss them)
+            self.client.ensure_sheets_exist(self._required_tabs)
+            request_rows, booking_rows = self.preload()
+            # 2. Standardize Environment, dropdowns sized to the rows actually in use
+            self.initialize_sheet_structure(len(request_rows))
+            # 3. Execute Transactions against the preloaded registry
+            count = self.process_unified_requests(request_rows, booking_rows)
+            # 4. Snapshot the registry (re-read only if step 3 wrote to it) so the
+            #    dashboard never reads the sheet while the archive rewrites it.
+            bookings = self.manager.get_all_bookings()
+
+            # 5 + 6. Archive old data (Elon Musk: Global Cleanup) while the dashboard
+            #        renders in the background: independent ranges, overlapped latency
+            logger.info("Archiving old data (Global Purge)...")
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                dashboard_job = pool.submit(self.dashboard.update_dashboard, bookings)
+                self.manager.archive_old_data()
+                dashboard_job.result()
+            
+            print("="*40)
+            print(f"COMPLETED: {count} OPERATIONS SYNCED")
+            print("="*40 + "\n")
+        except Exception as e:
+            logger.error(f"Sync Failure: {e}")
+            sys.exit(1)
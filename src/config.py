@@ -1,5 +1,7 @@
 """Configuration settings for the booking system."""
 
+from functools import lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -27,11 +29,16 @@ class Settings(BaseSettings):
     slot_duration_hours: int = 1
     max_bookings_per_user_per_week: int = 5
 
+    # Caching
+    cache_ttl_seconds: float = 5.0  # max age of the in-memory registry for display reads; writes always re-read
+
     model_config = SettingsConfigDict(
         env_file=".env", 
         env_file_encoding="utf-8",
         extra="ignore"
     )
 
+@lru_cache(maxsize=1)
 def get_settings():
+    """Return the process-wide settings, parsed from env/.env only once."""
     return Settings()
@@ -5,10 +5,13 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+from dateutil import tz
+
 from .config import get_settings
 from .sheets_client import SheetsClient
 from .booking_manager import BookingManager, Booking
 from .availability import AvailabilityDashboard
+from .bot import CourtBookingBot, REQUESTS_HEADERS, dropdown_end_row
 
 # Configure logging
 logging.basicConfig(
@@ -39,27 +42,23 @@ def cmd_update():
     logger.info("=== Starting scheduled update ===")
     
     try:
-        sheets_client, booking_manager, dashboard = initialize_components()
-        settings = get_settings()
+        # Same components and UI controls as run_bot.py: one implementation for both entry points
+        bot = CourtBookingBot()
+        sheets_client, booking_manager, dashboard = bot.client, bot.manager, bot.dashboard
+        settings = bot.settings
         
         # 1. OPTIONAL: Ensure sheet structure (Dropdowns, Tabs)
         try:
-            from datetime import timedelta
             logger.info("Standardizing UI controls and headers...")
             
             # Ensure headers match processing logic
-            req_headers = [["ACTION", "Date", "Time", "Court", "Name", "Phone", "Email", "Notes", "BOOKING_STATUS"]]
-            sheets_client.write_range(f"'{settings.requests_sheet_name}'!A1:I1", req_headers)
-            
-            dates = [(datetime.now() + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(14)]
-            times = [f"{h:02d}:00" for h in range(settings.operating_hours_start, settings.operating_hours_end)]
-            courts = [str(c) for c in range(1, settings.court_count + 1)]
-            actions = ["🆕 BOOKING", "🚫 CANCEL"]
+            sheets_client.write_range(f"'{settings.requests_sheet_name}'!A1:I1", REQUESTS_HEADERS)
             
-            sheets_client.set_dropdown(settings.requests_sheet_name, "A2:A300", actions)
-            sheets_client.set_dropdown(settings.requests_sheet_name, "B2:B300", dates)
-            sheets_client.set_dropdown(settings.requests_sheet_name, "C2:C300", times)
-            sheets_client.set_dropdown(settings.requests_sheet_name, "D2:D300", courts)
+            # Validate only the rows in use plus spare ones (served from the read cache by step 2)
+            used_rows = len(sheets_client.read_range(f"'{settings.requests_sheet_name}'!A2:I"))
+            with sheets_client.batched():
+                bot.set_request_dropdowns(2, dropdown_end_row(used_rows))
+            dashboard.ensure_layout()
         except Exception as ui_err:
             logger.warning(f"UI standardization skipped: {ui_err}")
 
@@ -182,9 +181,7 @@ def cmd_init_sheet():
         sheets_client.write_range(f"{settings.bookings_sheet_name}!A1:J1", headers)
         
         # Write header to Dashboard sheet
-        from dateutil import tz
-        taiwan_tz = tz.gettz("Asia/Taipei")
-        now_taiwan = datetime.now(taiwan_tz).strftime("%Y-%m-%d %H:%M")
+        now_taiwan = datetime.now(tz.gettz("Asia/Taipei")).strftime("%Y-%m-%d %H:%M")
         dashboard_header = [[f"📅 Weekly Court Availability - Updated: {now_taiwan} (Taipei Time)"]]
         sheets_client.write_range(f"{settings.dashboard_sheet_name}!A1:A1", dashboard_header)
         
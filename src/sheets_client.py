@@ -1,34 +1,242 @@
 """Google Sheets API client wrapper."""
 
+import json
 import logging
+import os
+import re
+import tempfile
 import time
 import random
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import google_auth_httplib2
+import httplib2
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 import logging
 
+try:
+    import orjson
+except ImportError:  # optional accelerator; stdlib json otherwise
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# batchUpdate request kinds that only touch layout/formatting, never cell values
+_VALUE_NEUTRAL_REQUESTS = {"updateDimensionProperties", "setDataValidation", "addConditionalFormatRule"}
+# Socket timeout (seconds) for the keep-alive transports
+_HTTP_TIMEOUT = 30
+
+# Transient statuses worth retrying, and the ceiling for a single backoff wait
+_RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+_MAX_BACKOFF_SECONDS = 60.0
+
+# Tab title -> sheetId maps persisted across runs; trusted for this long (seconds)
+_METADATA_CACHE_DIR = Path(tempfile.gettempdir())
+_METADATA_CACHE_TTL = 3600.0
+
+# Process-wide cap on in-flight API calls, shared by every client and worker thread
+_MAX_INFLIGHT_REQUESTS = 20
+
+# batchUpdate request kinds that change the set of tabs
+_SHEET_LIST_REQUESTS = {"addSheet", "deleteSheet", "duplicateSheet"}
+
+# Bounded A1 range without sheet prefix, e.g. 'B3:H100'
+_A1_RE = re.compile(r"([A-Z]+)(\d+):([A-Z]+)(\d+)")
+# Top-left cell of an A1 range without sheet prefix, e.g. 'B3' in 'B3:H100'
+_A1_START_RE = re.compile(r"([A-Z]+)(\d+)")
+
+# repeatCell field masks for format_cells, keyed on (sets background, sets text color)
+_BASE_FORMAT_FIELDS = (
+    "userEnteredFormat.textFormat.bold,"
+    "userEnteredFormat.textFormat.fontSize,"
+    "userEnteredFormat.horizontalAlignment"
+)
+_FIELD_MASKS = {
+    (False, False): _BASE_FORMAT_FIELDS,
+    (True, False): _BASE_FORMAT_FIELDS + ",userEnteredFormat.backgroundColor",
+    (False, True): _BASE_FORMAT_FIELDS + ",userEnteredFormat.textFormat.foregroundColor",
+    (True, True): _BASE_FORMAT_FIELDS + ",userEnteredFormat.backgroundColor,userEnteredFormat.textFormat.foregroundColor",
+}
+
+# Writes taller than this are sent as several values.update calls of this many rows
+_WRITE_CHUNK_ROWS = 2000
+
+
+def _col_letter_to_index(col: str) -> int:
+    """Zero-based column index of a column label ('A' -> 0, 'AA' -> 26)."""
+    index = 0
+    for char in col:
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+@lru_cache(maxsize=1024)
+def _col_index_to_letter(idx: int) -> str:
+    """Column label of a one-based column index (1 -> 'A', 27 -> 'AA')."""
+    letters = ""
+    while idx > 0:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _retry_after_seconds(resp) -> Optional[float]:
+    """Delay requested by a Retry-After header (delta-seconds or HTTP-date), if any."""
+    value = resp.get("retry-after") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that encodes request bodies and decodes responses with orjson."""
+
+    def serialize(self, body_value):
+        if isinstance(body_value, dict) and "data" not in body_value and self._data_wrapper:
+            body_value = {"data": body_value}
+        return orjson.dumps(body_value).decode()
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+def _row_chunk_anchors(range_name: str, total_rows: int, chunk_rows: int) -> Optional[List[str]]:
+    """Top-left cell of each `chunk_rows`-row slice of a write to `range_name`,
+    or None if the range has no starting row (e.g. 'A:I')."""
+    sheet, bang, cells = range_name.rpartition("!")
+    match = _A1_START_RE.match(cells.upper())
+    if not match:
+        return None
+    col, row = match.group(1), int(match.group(2))
+    return [f"{sheet}{bang}{col}{row + offset}" for offset in range(0, total_rows, chunk_rows)]
+
+
+@lru_cache(maxsize=512)
+def _parse_a1_range(range_name: str) -> Optional[tuple[int, int, int, int]]:
+    """Grid bounds of 'A2:C10' as (start_row, end_row, start_col, end_col), half-open and
+    zero-based as the batchUpdate API expects; None if the range is not in that form."""
+    match = _A1_RE.match(range_name.upper())
+    if not match:
+        return None
+    start_col_str, start_row_str, end_col_str, end_row_str = match.groups()
+    return (
+        int(start_row_str) - 1,
+        int(end_row_str),
+        _col_letter_to_index(start_col_str),
+        _col_letter_to_index(end_col_str) + 1,
+    )
+
+
+class _ConcurrencyLimiter:
+    """Cap on in-flight API calls that adapts to throttling (AIMD).
+
+    The cap halves on every 429 and grows back by one per successful call,
+    up to `max_limit`, so bursts settle at what the quota tolerates.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self._inflight >= self.limit:
+                self._cond.wait()
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify()
+
+    def on_success(self):
+        if self.limit < self.max_limit:
+            with self._cond:
+                self.limit = min(self.max_limit, self.limit + 1)
+                self._cond.notify()
+
+    def on_throttled(self):
+        with self._cond:
+            new_limit = max(1, self.limit // 2)
+            if new_limit != self.limit:
+                logger.warning(f"Throttled by the Sheets API; concurrency cap {self.limit} -> {new_limit}")
+                self.limit = new_limit
+
+
+_INFLIGHT_LIMITER = _ConcurrencyLimiter(_MAX_INFLIGHT_REQUESTS)
+
 
 class SheetsClient:
     """Google Sheets API wrapper with error handling and retry logic."""
 
     SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
-    def __init__(self, credentials_path: Any, sheet_id: str):
+    def __init__(self, credentials_path: Any, sheet_id: str, ttl_seconds: float = 5.0):
         """Initialize the Sheets client.
 
         Args:
             credentials_path: Path to JSON file OR a dictionary containing service account credentials.
             sheet_id: Google Sheets document ID.
+            ttl_seconds: How long read_range results are served from memory (0 disables).
         """
         if not sheet_id or sheet_id.strip() == "":
             raise ValueError("❌ Critical Error: Google Sheet ID is empty or not configured correctly.")
             
         self.sheet_id = sheet_id.strip()
+        # httplib2.Http is not thread-safe: each thread gets its own keep-alive transport
+        self._local = threading.local()
         self.service = self._authenticate(credentials_path)
+        # Resource handles bound once instead of re-resolved from discovery on every call
+        self._ss = self.service.spreadsheets()
+        self._values = self._ss.values()
+        # Short-lived read cache: range -> (fetched_at, rows)
+        self.ttl_seconds = ttl_seconds
+        self._read_cache: Dict[str, tuple[float, List[List[str]]]] = {}
+        # Tab title -> sheetId, fetched once; dropped when tabs are added or deleted
+        self._sheet_id_cache: Optional[Dict[str, int]] = None
+        # True while that map came from disk and may miss tabs added elsewhere since
+        self._sheet_ids_from_disk = False
+        self._metadata_cache_path = _METADATA_CACHE_DIR / f"sheets_meta_{self.sheet_id}.json"
+
+    @property
+    def _batch_buffer(self) -> Optional[List[Dict[str, Any]]]:
+        """Pending batchUpdate requests while this thread is inside a `batched()` block.
+
+        Per thread: calls made from other threads (thread pools in the bot) are sent
+        on their own and never join, or get flushed with, an unrelated batch.
+        """
+        return getattr(self._local, "batch_buffer", None)
+
+    @_batch_buffer.setter
+    def _batch_buffer(self, value: Optional[List[Dict[str, Any]]]):
+        self._local.batch_buffer = value
 
     def _authenticate(self, credentials_path: Any):
         """Authenticate with Google Sheets API supporting both files and dicts."""
@@ -47,49 +255,203 @@ class SheetsClient:
                 creds = Credentials.from_service_account_file(
                     credentials_path, scopes=self.SCOPES
                 )
-            return build("sheets", "v4", credentials=creds, cache_discovery=False)
+            self._credentials = creds
+            # Build on the authorized keep-alive transport instead of a throwaway one
+            model = _OrjsonModel() if orjson is not None else None
+            return build("sheets", "v4", http=self._thread_http(), model=model, cache_discovery=False)
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             raise
 
+    def _thread_http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """Return the calling thread's authorized HTTP transport.
+
+        httplib2 keeps the connection to sheets.googleapis.com open between
+        requests, so each thread pays the TLS handshake once.
+        """
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self._credentials, http=httplib2.Http(cache=None, timeout=_HTTP_TIMEOUT)
+            )
+            self._local.http = http
+        return http
+
     def _execute_with_retry(self, request, max_retries=3):
-        """Execute Google API request with exponential backoff."""
-        for attempt in range(max_retries):
+        """Execute Google API request with exponential backoff.
+
+        Transient errors are retried up to `max_retries` times, waiting for the
+        server's Retry-After when given, else a jittered exponential delay capped
+        at 60s. The last error propagates unchanged.
+
+        Safe to call from worker threads: the request runs on a per-thread transport.
+        """
+        for attempt in range(max_retries + 1):
             try:
-                return request.execute()
+                with _INFLIGHT_LIMITER.slot():
+                    response = request.execute(http=self._thread_http())
+                _INFLIGHT_LIMITER.on_success()
+                return response
             except HttpError as e:
-                if e.resp.status in [429, 500, 503]:
-                    wait_time = (2 ** attempt) + random.random()
-                    logger.warning(f"Rate limited. Retrying in {wait_time:.1f}s...")
-                    time.sleep(wait_time)
-                else:
+                status = e.resp.status
+                if status == 429:
+                    _INFLIGHT_LIMITER.on_throttled()
+                if status not in _RETRYABLE_STATUSES or attempt == max_retries:
                     raise
-        return request.execute()
+                retry_after = _retry_after_seconds(e.resp)
+                if retry_after is not None:
+                    wait_time = min(_MAX_BACKOFF_SECONDS, retry_after)
+                else:
+                    wait_time = min(_MAX_BACKOFF_SECONDS, 2 ** attempt) * (0.5 + random.random())
+                logger.warning(
+                    f"HTTP {status} (attempt {attempt + 1}/{max_retries + 1}). Retrying in {wait_time:.1f}s..."
+                )
+                time.sleep(wait_time)
 
-    def read_range(self, range_name: str) -> List[List[str]]:
+    @staticmethod
+    def _sheet_of(range_name: str) -> str:
+        """Sheet title of an A1 range ("'My Tab'!A1:B2" -> "My Tab")."""
+        return range_name.split("!", 1)[0].strip("'")
+
+    def invalidate(self, sheet_name: Optional[str] = None):
+        """Drop cached reads for one sheet (all sheets when None)."""
+        if sheet_name is None:
+            self._read_cache.clear()
+            return
+        for key in [k for k in list(self._read_cache) if self._sheet_of(k) == sheet_name]:
+            self._read_cache.pop(key, None)
+
+    @staticmethod
+    def _touches_values(updates: List[Dict[str, Any]]) -> bool:
+        """Whether a batchUpdate may change cell values (or the set of sheets)."""
+        for update in updates:
+            kind = next(iter(update), "")
+            if kind == "repeatCell":
+                if "userEnteredValue" in update[kind].get("fields", ""):
+                    return True
+            elif kind not in _VALUE_NEUTRAL_REQUESTS:
+                return True
+        return False
+
+    def read_range(self, range_name: str, fresh: bool = False) -> List[List[str]]:
         """Read data from a specific range.
 
+        Results are reused for `ttl_seconds` unless a write invalidates them.
+
         Args:
             range_name: A1 notation range (e.g., 'Sheet1!A1:J100').
+            fresh: Skip the read cache, e.g. to see other writers' changes.
 
         Returns:
             List of rows, where each row is a list of cell values.
         """
+        cached = None if fresh else self._read_cache.get(range_name)
+        if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+
         try:
-            request = self.service.spreadsheets().values().get(
+            request = self._values.get(
                 spreadsheetId=self.sheet_id, range=range_name
             )
             result = self._execute_with_retry(request)
-            return result.get("values", [])
+            rows = result.get("values", [])
+            self._read_cache[range_name] = (time.monotonic(), rows)
+            return rows
         except HttpError as e:
             logger.error(f"Error reading range {range_name}: {e}")
             raise
 
+    def read_ranges(self, ranges: List[str]) -> Dict[str, List[List[str]]]:
+        """Read several ranges in one values.batchGet round-trip.
+
+        Results also seed the read cache, so later read_range calls for the
+        same ranges are served from memory.
+
+        Args:
+            ranges: A1 notation ranges.
+
+        Returns:
+            Mapping of each requested range to its rows.
+        """
+        try:
+            request = self._values.batchGet(
+                spreadsheetId=self.sheet_id, ranges=ranges, valueRenderOption="FORMATTED_VALUE"
+            )
+            result = self._execute_with_retry(request)
+            now = time.monotonic()
+            data = {}
+            # valueRanges come back in request order, but with normalized range names
+            for range_name, value_range in zip(ranges, result.get("valueRanges", []), strict=True):
+                rows = value_range.get("values", [])
+                data[range_name] = rows
+                self._read_cache[range_name] = (now, rows)
+            return data
+        except HttpError as e:
+            logger.error(f"Error batch reading ranges {ranges}: {e}")
+            raise
+
+    def read_ranges_parallel(self, ranges: List[str], max_workers: int = 8) -> List[List[List[str]]]:
+        """Read ranges concurrently with one values.get per range.
+
+        For reads that cannot share a batchGet; prefer read_ranges otherwise.
+        Each worker thread uses its own transport, and the process-wide
+        in-flight cap keeps the total below the API's concurrency limit.
+
+        Args:
+            ranges: A1 notation ranges.
+            max_workers: Maximum number of concurrent requests from this call.
+
+        Returns:
+            Rows for each range, in request order.
+        """
+        if len(ranges) <= 1:
+            return [self.read_range(r) for r in ranges]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ranges))) as executor:
+            return list(executor.map(self.read_range, ranges))
+
+    def iter_rows(
+        self, sheet_name: str, start_row: int = 1, chunk_rows: int = 1000, end_col: str = "Z"
+    ) -> Iterator[List[str]]:
+        """Stream a sheet's rows in pages of `chunk_rows`, so callers can stop early.
+
+        The n-th yielded row is sheet row `start_row + n`; blank rows come out
+        as empty lists. Iteration ends at the first page with no data. Pages
+        bypass the read cache.
+
+        Args:
+            sheet_name: Name of the sheet.
+            start_row: First row to read (1-indexed).
+            chunk_rows: Rows fetched per request.
+            end_col: Last column to read.
+        """
+        row = start_row
+        skipped_blanks = 0
+        while True:
+            range_name = f"'{sheet_name}'!A{row}:{end_col}{row + chunk_rows - 1}"
+            try:
+                request = self._values.get(spreadsheetId=self.sheet_id, range=range_name)
+                rows = self._execute_with_retry(request).get("values", [])
+            except HttpError as e:
+                logger.error(f"Error reading range {range_name}: {e}")
+                raise
+            if not rows:
+                return
+            # The API drops trailing blank rows; emit them only once more data follows
+            for _ in range(skipped_blanks):
+                yield []
+            yield from rows
+            skipped_blanks = chunk_rows - len(rows)
+            row += chunk_rows
+
     def write_range(
         self, range_name: str, values: List[List[Any]], value_input_option: str = "RAW"
     ) -> bool:
         """Write data to a specific range.
 
+        Writes taller than `_WRITE_CHUNK_ROWS` rows go out as consecutive
+        chunks, each retried on its own, so a transient failure re-sends one
+        chunk rather than the whole payload. Such a write is not atomic.
+
         Args:
             range_name: A1 notation range.
             values: 2D list of values to write.
@@ -98,9 +460,18 @@ class SheetsClient:
         Returns:
             True if successful.
         """
+        if len(values) > _WRITE_CHUNK_ROWS:
+            anchors = _row_chunk_anchors(range_name, len(values), _WRITE_CHUNK_ROWS)
+            if anchors:
+                for i, anchor in enumerate(anchors):
+                    chunk = values[i * _WRITE_CHUNK_ROWS:(i + 1) * _WRITE_CHUNK_ROWS]
+                    self.write_range(anchor, chunk, value_input_option)
+                return True
+
+        self.invalidate(self._sheet_of(range_name))
         try:
             body = {"values": values}
-            request = self.service.spreadsheets().values().update(
+            request = self._values.update(
                 spreadsheetId=self.sheet_id,
                 range=range_name,
                 valueInputOption=value_input_option,
@@ -114,6 +485,35 @@ class SheetsClient:
             logger.error(f"Error writing to {range_name}: {e}")
             raise
 
+    def write_ranges(
+        self, data: Dict[str, List[List[Any]]], value_input_option: str = "RAW"
+    ) -> bool:
+        """Write several ranges in a single values.batchUpdate call.
+
+        Args:
+            data: Mapping of A1 notation range to the 2D list of values to write.
+            value_input_option: How to interpret input ('RAW' or 'USER_ENTERED').
+
+        Returns:
+            True if successful.
+        """
+        for sheet_name in {self._sheet_of(r) for r in data}:
+            self.invalidate(sheet_name)
+        try:
+            body = {
+                "valueInputOption": value_input_option,
+                "data": [{"range": r, "values": v} for r, v in data.items()],
+            }
+            request = self._values.batchUpdate(
+                spreadsheetId=self.sheet_id, body=body
+            )
+            self._execute_with_retry(request)
+            logger.info(f"Successfully wrote {len(data)} ranges")
+            return True
+        except HttpError as e:
+            logger.error(f"Error batch writing {list(data)}: {e}")
+            raise
+
     def clear_range(self, range_name: str) -> bool:
         """Clear values from a specific range.
 
@@ -123,8 +523,9 @@ class SheetsClient:
         Returns:
             True if successful.
         """
+        self.invalidate(self._sheet_of(range_name))
         try:
-            request = self.service.spreadsheets().values().clear(
+            request = self._values.clear(
                 spreadsheetId=self.sheet_id,
                 range=range_name,
                 body={}
@@ -136,6 +537,28 @@ class SheetsClient:
             logger.error(f"Error clearing {range_name}: {e}")
             raise
 
+    def clear_ranges(self, ranges: List[str]) -> bool:
+        """Clear several ranges in a single values.batchClear call.
+
+        Args:
+            ranges: A1 notation ranges.
+
+        Returns:
+            True if successful.
+        """
+        for sheet_name in {self._sheet_of(r) for r in ranges}:
+            self.invalidate(sheet_name)
+        try:
+            request = self._values.batchClear(
+                spreadsheetId=self.sheet_id, body={"ranges": ranges}
+            )
+            self._execute_with_retry(request)
+            logger.info(f"Successfully cleared {len(ranges)} ranges")
+            return True
+        except HttpError as e:
+            logger.error(f"Error batch clearing {ranges}: {e}")
+            raise
+
     def append_row(
         self, range_name: str, values: List[Any], value_input_option: str = "USER_ENTERED"
     ) -> int:
@@ -149,27 +572,39 @@ class SheetsClient:
         Returns:
             Row number where data was appended.
         """
+        return self.append_rows(range_name, [values], value_input_option)
+
+    def append_rows(
+        self, range_name: str, rows: List[List[Any]], value_input_option: str = "USER_ENTERED"
+    ) -> int:
+        """Append several rows to the end of the range in one call.
+
+        Args:
+            range_name: A1 notation range (e.g., 'Bookings!A:J').
+            rows: 2D list of values.
+            value_input_option: How to interpret input.
+
+        Returns:
+            Row number of the first appended row.
+        """
+        self.invalidate(self._sheet_of(range_name))
         try:
-            body = {"values": [values]}
-            request = (
-                self.service.spreadsheets()
-                .values()
-                .append(
-                    spreadsheetId=self.sheet_id,
-                    range=range_name,
-                    valueInputOption=value_input_option,
-                    body=body,
-                )
+            body = {"values": rows}
+            request = self._values.append(
+                spreadsheetId=self.sheet_id,
+                range=range_name,
+                valueInputOption=value_input_option,
+                body=body,
             )
             result = self._execute_with_retry(request)
             updates = result.get("updates", {})
             updated_range = updates.get("updatedRange", "")
             # Extract row number from range like 'Bookings!A5:J5'
             row_num = int(updated_range.split("!")[-1].split(":")[0][1:])
-            logger.info(f"Appended row {row_num}")
+            logger.info(f"Appended {len(rows)} row(s) at row {row_num}")
             return row_num
         except HttpError as e:
-            logger.error(f"Error appending row: {e}")
+            logger.error(f"Error appending rows to {range_name}: {e}")
             raise
 
     def update_cell(
@@ -186,42 +621,167 @@ class SheetsClient:
         Returns:
             True if successful.
         """
-        col_letter = chr(64 + col)  # Convert 1->A, 2->B, etc.
-        range_name = f"{sheet_name}!{col_letter}{row}"
+        range_name = f"'{sheet_name}'!{_col_index_to_letter(col)}{row}"
         return self.write_range(range_name, [[value]], "USER_ENTERED")
 
-    def get_sheet_id(self, sheet_name: str) -> Optional[int]:
-        """Get the numerical ID for a sheet by its title."""
+    def update_column(
+        self, sheet_name: str, col_letter: str, start_row: int, values: List[List[Any]]
+    ) -> bool:
+        """Write a contiguous run of cells in one column with a single request.
+
+        Args:
+            sheet_name: Name of the sheet.
+            col_letter: Column letter (e.g., 'I').
+            start_row: First row number to write (1-indexed).
+            values: One single-item list per row, e.g. [["✅ BOOKED"], ["❌ ERROR"]].
+
+        Returns:
+            True if successful.
+        """
+        end_row = start_row + len(values) - 1
+        range_name = f"'{sheet_name}'!{col_letter}{start_row}:{col_letter}{end_row}"
+        return self.write_range(range_name, values, "RAW")
+
+    def _sheet_ids(self, verify: bool = False) -> Dict[str, int]:
+        """Title -> sheetId for every tab, in tab order.
+
+        Served from memory, else from the on-disk copy left by a recent run,
+        until the tab list changes.
+
+        Args:
+            verify: Refetch if the map came from disk (call before acting on a missing tab).
+        """
+        sheet_ids = self._sheet_id_cache
+        if sheet_ids is not None and not (verify and self._sheet_ids_from_disk):
+            return sheet_ids
+        if sheet_ids is None and not verify:
+            sheet_ids = self._load_sheet_ids()
+            if sheet_ids is not None:
+                self._sheet_id_cache, self._sheet_ids_from_disk = sheet_ids, True
+                return sheet_ids
+
+        request = self._ss.get(
+            spreadsheetId=self.sheet_id, fields="sheets.properties(sheetId,title)"
+        )
+        spreadsheet = self._execute_with_retry(request)
+        sheet_ids = {
+            sheet["properties"]["title"]: sheet["properties"]["sheetId"]
+            for sheet in spreadsheet.get("sheets", [])
+        }
+        self._sheet_id_cache, self._sheet_ids_from_disk = sheet_ids, False
+        self._save_sheet_ids(sheet_ids)
+        return sheet_ids
+
+    def _load_sheet_ids(self) -> Optional[Dict[str, int]]:
         try:
-            spreadsheet = self.service.spreadsheets().get(spreadsheetId=self.sheet_id).execute()
-            for sheet in spreadsheet.get("sheets", []):
-                if sheet["properties"]["title"] == sheet_name:
-                    return sheet["properties"]["sheetId"]
+            data = json.loads(self._metadata_cache_path.read_text(encoding="utf-8"))
+            if time.time() - data["saved_at"] > _METADATA_CACHE_TTL:
+                return None
+            return {str(title): int(sheet_id) for title, sheet_id in data["sheets"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
             return None
+
+    def _save_sheet_ids(self, sheet_ids: Dict[str, int]):
+        tmp_path = self._metadata_cache_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps({"saved_at": time.time(), "sheets": sheet_ids}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self._metadata_cache_path)
+        except OSError as e:
+            logger.warning(f"Could not persist sheet metadata: {e}")
+
+    def get_sheet_id(self, sheet_name: str) -> Optional[int]:
+        """Get the numerical ID for a sheet by its title.
+
+        Cached ids are trusted. A tab recreated under the same title gets a new
+        id; the batchUpdate that sends the old one fails with "No grid with id",
+        which drops the cache, so the next lookup refetches.
+        """
+        try:
+            sheet_id = self._sheet_ids().get(sheet_name)
+            if sheet_id is None and self._sheet_ids_from_disk:
+                sheet_id = self._sheet_ids(verify=True).get(sheet_name)
+            return sheet_id
         except HttpError as e:
             logger.error(f"Error getting sheet ID: {e}")
             raise
 
+    def invalidate_sheet_cache(self):
+        """Forget the cached tab ids and names (after tabs were added or deleted)."""
+        self._sheet_id_cache = None
+        self._sheet_ids_from_disk = False
+        try:
+            self._metadata_cache_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not drop persisted sheet metadata: {e}")
+
     def delete_sheet_by_name(self, sheet_name: str) -> bool:
         """Delete a sheet tab by its name."""
         sheet_id = self.get_sheet_id(sheet_name)
         if sheet_id is not None:
             logger.info(f"Deleting default sheet: {sheet_name}")
-            return self.batch_update([{"deleteSheet": {"sheetId": sheet_id}}])
+            return self.batch_update([self._build_delete_sheet_request(sheet_id)])
         return False
 
+    @staticmethod
+    def _build_delete_sheet_request(sheet_id: int) -> Dict[str, Any]:
+        return {"deleteSheet": {"sheetId": sheet_id}}
+
     def set_dropdown(self, sheet_name: str, range_name: str, options: List[str]):
         """Create a drop-down menu in the specified range."""
+        return self.set_dropdowns(sheet_name, [(range_name, options)])
+
+    def set_dropdowns(self, sheet_name: str, specs: List[Tuple[str, List[str]]]):
+        """Create several drop-down menus on one sheet in a single batchUpdate.
+
+        Args:
+            sheet_name: Name of the sheet.
+            specs: (range, options) pairs, e.g. ('A2:A100', ['Yes', 'No']).
+                Ranges that are not bounded A1 ranges are skipped.
+        """
         sheet_id = self.get_sheet_id(sheet_name)
         if sheet_id is None:
             return
 
-        # Parse range (e.g., 'A2:A100')
-        start_col = ord(range_name[0].upper()) - 65
-        start_row = int(''.join(filter(str.isdigit, range_name.split(':')[0]))) - 1
-        end_row = int(''.join(filter(str.isdigit, range_name.split(':')[1])))
+        requests = []
+        for range_name, options in specs:
+            bounds = _parse_a1_range(range_name)
+            if bounds is None:
+                continue
+            start_row, end_row, start_col, _ = bounds
+            requests.append(self._build_dropdown_request(sheet_id, start_row, end_row, start_col, options))
+        if not requests:
+            return
+        return self.batch_update(requests)
+
+    def clear_data_validation(self, sheet_name: str, range_name: str):
+        """Remove any data validation from a range (setDataValidation without a rule).
 
-        request = {
+        Args:
+            sheet_name: Name of the sheet.
+            range_name: Bounded A1 range, e.g. 'A51:D300'.
+        """
+        sheet_id = self.get_sheet_id(sheet_name)
+        bounds = _parse_a1_range(range_name)
+        if sheet_id is None or bounds is None:
+            return
+        start_row, end_row, start_col, end_col = bounds
+        return self.batch_update([{
+            "setDataValidation": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "startRowIndex": start_row,
+                    "endRowIndex": end_row,
+                    "startColumnIndex": start_col,
+                    "endColumnIndex": end_col
+                }
+            }
+        }])
+
+    @staticmethod
+    def _build_dropdown_request(sheet_id: int, start_row: int, end_row: int, start_col: int,
+                                options: List[str]) -> Dict[str, Any]:
+        """setDataValidation request for a one-column ONE_OF_LIST drop-down."""
+        return {
             "setDataValidation": {
                 "range": {
                     "sheetId": sheet_id,
@@ -240,57 +800,128 @@ class SheetsClient:
                 }
             }
         }
-        return self.batch_update([request])
 
     def get_sheet_names(self) -> List[str]:
         """Get a list of all sheet names in the spreadsheet."""
         try:
-            request = self.service.spreadsheets().get(spreadsheetId=self.sheet_id)
-            spreadsheet = self._execute_with_retry(request)
-            return [sheet["properties"]["title"] for sheet in spreadsheet.get("sheets", [])]
+            return list(self._sheet_ids())
         except HttpError as e:
             logger.error(f"Error getting sheet names: {e}")
             raise
 
-    def ensure_sheets_exist(self, sheet_names: List[str]) -> bool:
-        """Check if sheets exist and create them if missing."""
-        existing_sheets = self.get_sheet_names()
+    def ensure_sheets_exist(self, sheet_names: List[str], optimistic: bool = False) -> bool:
+        """Check if sheets exist and create them if missing.
+
+        Args:
+            sheet_names: Tab titles that must exist.
+            optimistic: When no tab list is cached yet, skip listing the tabs and
+                add them all in one batchUpdate. A single tab that "already exists"
+                counts as success; for several, the tabs are then listed as usual.
+                Saves a round-trip when the tabs are usually there already.
+        """
+        if (optimistic and self._batch_buffer is None and self._sheet_id_cache is None
+                and self._load_sheet_ids() is None):
+            added = self._add_sheets_optimistically(sheet_names)
+            if added is not None:
+                return added
+
+        existing_sheets = set(self._sheet_ids())
+        if self._sheet_ids_from_disk and not existing_sheets.issuperset(sheet_names):
+            existing_sheets = set(self._sheet_ids(verify=True))
         requests = []
         
         for name in sheet_names:
             if name not in existing_sheets:
                 logger.info(f"Adding missing sheet: {name}")
-                requests.append({
-                    "addSheet": {
-                        "properties": {
-                            "title": name
-                        }
-                    }
-                })
+                requests.append(self._build_add_sheet_request(name))
         
         if requests:
             return self.batch_update(requests)
         return True
 
+    def _add_sheets_optimistically(self, sheet_names: List[str]) -> Optional[bool]:
+        """addSheet every name in one batchUpdate, without listing the tabs first.
+
+        Returns:
+            True once the tabs exist, or None when some of several already existed:
+            the batch is atomic, so nothing was added and the caller lists the tabs.
+        """
+        request = self._ss.batchUpdate(
+            spreadsheetId=self.sheet_id,
+            body={"requests": [self._build_add_sheet_request(name) for name in sheet_names]},
+        )
+        try:
+            self._execute_with_retry(request)
+        except HttpError as e:
+            if e.resp.status == 400 and "already exists" in str(e):
+                return True if len(sheet_names) == 1 else None
+            logger.error(f"Batch update failed: {e}")
+            raise
+        logger.info(f"Added missing sheets: {', '.join(sheet_names)}")
+        self.invalidate_sheet_cache()
+        return True
+
+    @staticmethod
+    def _build_add_sheet_request(title: str) -> Dict[str, Any]:
+        return {"addSheet": {"properties": {"title": title}}}
+
+    @contextmanager
+    def batched(self):
+        """Buffer every batch_update inside the block and send them as one request on exit.
+
+        Formatting helpers (set_dropdown, format_cells, set_row_height, ...) all go
+        through batch_update, so wrapping them collapses N round-trips into one.
+        Nested blocks join the outermost batch.
+        """
+        if self._batch_buffer is not None:
+            yield self
+            return
+
+        self._batch_buffer = []
+        try:
+            yield self
+        except BaseException:
+            self._batch_buffer = None
+            raise
+        pending, self._batch_buffer = self._batch_buffer, None
+        if pending:
+            self.batch_update(pending)
+
     def batch_update(self, updates: List[Dict[str, Any]]) -> bool:
         """Perform batch updates for efficiency.
 
+        Inside a `batched()` block the requests are queued instead of sent.
+
         Args:
             updates: List of update requests.
 
         Returns:
             True if successful.
         """
+        if self._batch_buffer is not None:
+            self._batch_buffer.extend(updates)
+            return True
+
+        if self._touches_values(updates):
+            self.invalidate()
         try:
             body = {"requests": updates}
-            request = self.service.spreadsheets().batchUpdate(
+            request = self._ss.batchUpdate(
                 spreadsheetId=self.sheet_id, body=body
             )
-            self._execute_with_retry(request)
+            try:
+                self._execute_with_retry(request)
+            finally:
+                # Also on failure: part of a batch may have applied before the error
+                if any(next(iter(update), "") in _SHEET_LIST_REQUESTS for update in updates):
+                    self.invalidate_sheet_cache()
             logger.info(f"Batch update completed with {len(updates)} requests")
             return True
         except HttpError as e:
             logger.error(f"Batch update failed: {e}")
+            if e.resp.status == 400 and "No grid with id" in str(e):
+                # Stale sheetId (tab deleted or recreated): never reuse the cached ids
+                self.invalidate_sheet_cache()
             raise
 
     def set_row_height(self, sheet_name: str, start_row: int, end_row: int, height: int):
@@ -298,28 +929,22 @@ class SheetsClient:
         sheet_id = self.get_sheet_id(sheet_name)
         if sheet_id is None: return
         
-        request = {
-            "updateDimensionProperties": {
-                "range": {
-                    "sheetId": sheet_id,
-                    "dimension": "ROWS",
-                    "startIndex": start_row,
-                    "endIndex": end_row
-                },
-                "properties": {
-                    "pixelSize": height
-                },
-                "fields": "pixelSize"
-            }
-        }
-        return self.batch_update([request])
+        return self.batch_update([self._build_dimension_request(sheet_id, "ROWS", start_row, end_row, height)])
 
     def set_column_width(self, sheet_name: str, start_col: int, end_col: int, width: int):
         """Set width of columns for better visualization."""
         sheet_id = self.get_sheet_id(sheet_name)
         if sheet_id is None: return
         
-        request = {
+        return self.batch_update([self._build_dimension_request(sheet_id, "COLUMNS", start_col, end_col, width)])
+
+    def hide_columns(self, sheet_name: str, start_col: int, end_col: int):
+        """Hide columns [start_col, end_col) (zero-based), e.g. for bookkeeping cells."""
+        sheet_id = self.get_sheet_id(sheet_name)
+        if sheet_id is None:
+            return
+
+        return self.batch_update([{
             "updateDimensionProperties": {
                 "range": {
                     "sheetId": sheet_id,
@@ -328,12 +953,30 @@ class SheetsClient:
                     "endIndex": end_col
                 },
                 "properties": {
-                    "pixelSize": width
+                    "hiddenByUser": True
+                },
+                "fields": "hiddenByUser"
+            }
+        }])
+
+    @staticmethod
+    def _build_dimension_request(sheet_id: int, dimension: str, start: int, end: int,
+                                 pixel_size: int) -> Dict[str, Any]:
+        """updateDimensionProperties request sizing ROWS or COLUMNS [start, end)."""
+        return {
+            "updateDimensionProperties": {
+                "range": {
+                    "sheetId": sheet_id,
+                    "dimension": dimension,
+                    "startIndex": start,
+                    "endIndex": end
+                },
+                "properties": {
+                    "pixelSize": pixel_size
                 },
                 "fields": "pixelSize"
             }
         }
-        return self.batch_update([request])
 
     def format_cells(self, sheet_name: str, range_name: str, 
                      bg_color: Dict[str, float] = None, 
@@ -346,50 +989,32 @@ class SheetsClient:
         if sheet_id is None: return
 
         # Simple range parser (A1:B10)
-        import re
-        match = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", range_name.upper())
-        if not match: return
-        
-        start_col_str, start_row_str, end_col_str, end_row_str = match.groups()
-        
-        def col_to_index(col):
-            index = 0
-            for char in col: index = index * 26 + (ord(char) - ord('A') + 1)
-            return index - 1
-
-        start_col = col_to_index(start_col_str)
-        end_col = col_to_index(end_col_str) + 1
-        start_row = int(start_row_str) - 1
-        end_row = int(end_row_str)
-
-        # 1. Start with base fields
-        fields_list = [
-            "userEnteredFormat.textFormat.bold",
-            "userEnteredFormat.textFormat.fontSize",
-            "userEnteredFormat.horizontalAlignment"
-        ]
-        
-        # 2. Base cell data
-        cell_data = {
-            "userEnteredFormat": {
-                "textFormat": {
-                    "bold": bold,
-                    "fontSize": font_size
-                },
-                "horizontalAlignment": horizontal_alignment
-            }
-        }
+        bounds = _parse_a1_range(range_name)
+        if bounds is None:
+            return
+        start_row, end_row, start_col, end_col = bounds
+
+        request = self._build_format_request(
+            sheet_id, start_row, end_row, start_col, end_col,
+            bg_color, text_color, bold, font_size, horizontal_alignment,
+        )
+        return self.batch_update([request])
+
+    @staticmethod
+    def _build_format_request(sheet_id: int, start_row: int, end_row: int, start_col: int, end_col: int,
+                              bg_color: Optional[Dict[str, float]], text_color: Optional[Dict[str, float]],
+                              bold: bool, font_size: int, horizontal_alignment: str) -> Dict[str, Any]:
+        """repeatCell request that touches only the formatting fields being set."""
+        text_format = {"bold": bold, "fontSize": font_size}
+        user_format = {"textFormat": text_format, "horizontalAlignment": horizontal_alignment}
 
-        # 3. Dynamic overrides
+        # Optional overrides; the field mask is picked from the precomputed table
         if bg_color:
-            cell_data["userEnteredFormat"]["backgroundColor"] = bg_color
-            fields_list.append("userEnteredFormat.backgroundColor")
-            
+            user_format["backgroundColor"] = bg_color
         if text_color:
-            cell_data["userEnteredFormat"]["textFormat"]["foregroundColor"] = text_color
-            fields_list.append("userEnteredFormat.textFormat.foregroundColor")
+            text_format["foregroundColor"] = text_color
 
-        request = {
+        return {
             "repeatCell": {
                 "range": {
                     "sheetId": sheet_id,
@@ -398,33 +1023,29 @@ class SheetsClient:
                     "startColumnIndex": start_col,
                     "endColumnIndex": end_col
                 },
-                "cell": cell_data,
-                "fields": ",".join(fields_list)
+                "cell": {"userEnteredFormat": user_format},
+                "fields": _FIELD_MASKS[(bool(bg_color), bool(text_color))]
             }
         }
-        
-        return self.batch_update([request])
 
     def add_conditional_formatting(self, sheet_name: str, range_name: str, rules: List[Dict]):
         """Add conditional formatting rules to a range."""
         sheet_id = self.get_sheet_id(sheet_name)
         if sheet_id is None: return
 
-        import re
-        match = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", range_name.upper())
-        if not match: return
-        start_col_str, start_row_str, end_col_str, end_row_str = match.groups()
-        
-        def col_to_index(col):
-            index = 0
-            for char in col: index = index * 26 + (ord(char) - ord('A') + 1)
-            return index - 1
+        bounds = _parse_a1_range(range_name)
+        if bounds is None:
+            return
+        start_row, end_row, start_col, end_col = bounds
 
-        start_col = col_to_index(start_col_str)
-        end_col = col_to_index(end_col_str) + 1
-        start_row = int(start_row_str) - 1
-        end_row = int(end_row_str)
+        return self.batch_update(
+            self._build_conditional_format_requests(sheet_id, start_row, end_row, start_col, end_col, rules)
+        )
 
+    @staticmethod
+    def _build_conditional_format_requests(sheet_id: int, start_row: int, end_row: int, start_col: int,
+                                           end_col: int, rules: List[Dict]) -> List[Dict[str, Any]]:
+        """One addConditionalFormatRule (TEXT_CONTAINS) request per rule."""
         requests = []
         for rule in rules:
             formatted_rule = {
@@ -452,5 +1073,4 @@ class SheetsClient:
                 }
             }
             requests.append(formatted_rule)
-        
-        return self.batch_update(requests)
+        return requests
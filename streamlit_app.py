@@ -1,26 +1,38 @@
 import os
 import sys
+import json
 import logging
+from importlib.util import find_spec
 
 # --- EXPERT RECOVERY: Environment Auditor ---
 # Remove local shadowing and handle binary dependency conflicts
-if os.path.exists(os.path.join(os.getcwd(), 'numpy')) or os.path.exists(os.path.join(os.getcwd(), 'pydantic')):
-    sys.path = [p for p in sys.path if p != os.getcwd() and p != '']
+# (filesystem probes only while the cwd is still on sys.path, i.e. not on every rerun)
+_cwd = os.getcwd()
+if (_cwd in sys.path or '' in sys.path) and (
+    os.path.exists(os.path.join(_cwd, 'numpy')) or os.path.exists(os.path.join(_cwd, 'pydantic'))
+):
+    sys.path = [p for p in sys.path if p != _cwd and p != '']
+
+_AUDITED_MODULES = {
+    "numpy": "numpy",
+    "pandas": "pandas",
+    "pydantic_core._pydantic_core": "pydantic-core (binary extension)",
+    "_cffi_backend": "cffi (binary backend)",
+}
+
+def _module_missing(name):
+    try:
+        return find_spec(name) is None
+    except (ImportError, ValueError):  # parent package absent or broken
+        return True
 
 def audit_environment():
-    missing = []
-    try:
-        import numpy
-    except ImportError: missing.append("numpy")
-    try:
-        import pandas
-    except ImportError: missing.append("pandas")
-    try:
-        from pydantic_core import _pydantic_core
-    except ImportError: missing.append("pydantic-core (binary extension)")
-    try:
-        import _cffi_backend
-    except ImportError: missing.append("cffi (binary backend)")
+    # Streamlit re-executes this script on every interaction: probe once per process
+    if os.environ.get("_COURT_BOOKING_AUDITED"):
+        return []
+    os.environ["_COURT_BOOKING_AUDITED"] = "1"
+    # find_spec locates modules without running them; the real imports happen below
+    missing = [label for name, label in _AUDITED_MODULES.items() if _module_missing(name)]
     
     if missing:
         print(f"CRITICAL: Environment corruption detected for: {', '.join(missing)}")
@@ -33,11 +45,13 @@ audit_environment()
 try:
     import numpy as np
     import pandas as pd
-except ImportError:
-    # Silent fail as the Auditor already printed details
-    pass
+except ImportError as e:
+    # Reported on the page below, once Streamlit is configured
+    np = pd = None
+    _DATA_STACK_ERROR = e
 
 import streamlit as st
+import plotly.express as px
 from datetime import datetime, timedelta
 from src.config import get_settings
 from src.sheets_client import SheetsClient
@@ -57,8 +71,13 @@ st.set_page_config(
     initial_sidebar_state="collapsed", # Better for mobile first view
 )
 
+# Every tab renders through pandas: stop with one clear message instead of a NameError later
+if pd is None:
+    st.error(f"❌ numpy/pandas could not be imported ({_DATA_STACK_ERROR}). Reinstall them and restart the app.")
+    st.stop()
+
 # Custom CSS for Premium Look & Mobile Optimization
-st.markdown("""
+_CSS = """
 <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;600;700&family=Plus+Jakarta+Sans:wght@300;400;500;600;700&display=swap" rel="stylesheet">
 <style>
     :root {
@@ -227,75 +246,175 @@ st.markdown("""
         }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+# Emitted on every run: Streamlit removes elements a rerun does not produce,
+# so gating this to the first run of a session would strip the styling
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Initialization
+def _resolve_creds(settings):
+    # --- Expert Deploy: Secrets Management ---
+    # On Streamlit Cloud, use Secrets. On local, fallback to JSON file.
+    if "GOOGLE_CREDENTIALS" not in st.secrets:
+        return settings.google_credentials_path
+    creds_info = st.secrets["GOOGLE_CREDENTIALS"]
+    # Streamlit secrets sometimes returns a string for multiline TOML or JSON
+    if isinstance(creds_info, str):
+        try:
+            creds_info = json.loads(creds_info)
+        except json.JSONDecodeError:
+            st.error("❌ GOOGLE_CREDENTIALS secret is not a valid JSON string.")
+            raise
+    return creds_info
+
+# Secrets are resolved inside the cached constructor, i.e. once per process, not per rerun
 @st.cache_resource
 def get_components():
     settings = get_settings()
-    
-    # --- Expert Deploy: Secrets Management ---
-    # On Streamlit Cloud, use Secrets. On local, fallback to JSON file.
-    creds_info = None
-    if "GOOGLE_CREDENTIALS" in st.secrets:
-        creds_info = st.secrets["GOOGLE_CREDENTIALS"]
-        # Streamlit secrets sometimes returns a string for multiline TOML or JSON
-        if isinstance(creds_info, str):
-            import json
-            try:
-                creds_info = json.loads(creds_info)
-            except json.JSONDecodeError:
-                st.error("❌ GOOGLE_CREDENTIALS secret is not a valid JSON string.")
-                raise
-    else:
-        creds_info = settings.google_credentials_path
-
     sheets_client = SheetsClient(
-        credentials_path=creds_info,
+        credentials_path=_resolve_creds(settings),
         sheet_id=settings.sheet_id
     )
     booking_manager = BookingManager(sheets_client)
     dashboard = AvailabilityDashboard(sheets_client, booking_manager)
-    return settings, sheets_client, booking_manager, dashboard
+    return sheets_client, booking_manager, dashboard
 
-settings, sheets_client, booking_manager, dashboard = get_components()
+# Settings are memoized process-wide by get_settings itself; only live clients need the resource cache
+settings = get_settings()
+sheets_client, booking_manager, dashboard = get_components()
 
 # Helper Functions
+_TAIWAN_TZ = tz.gettz("Asia/Taipei")
+
 def get_taipei_now():
-    return datetime.now(tz.gettz("Asia/Taipei"))
+    return datetime.now(_TAIWAN_TZ)
 
-def format_availability_df(bookings, days=7):
-    taiwan_now = get_taipei_now()
-    start_date = taiwan_now.replace(hour=0, minute=0, second=0, microsecond=0)
-    dates = [start_date + timedelta(days=i) for i in range(days)]
-    
-    # Create lookup map
-    lookup = {}
-    for b in bookings:
-        if "Booked" in b.status:
-            key = f"{b.date.strftime('%Y-%m-%d')}_{b.time_slot}_{b.court}"
-            lookup[key] = b.customer_name
-
-    data = []
-    start_h = settings.operating_hours_start
-    end_h = settings.operating_hours_end
-    court_count = settings.court_count
+# Shared immutable tuple per hours setting: cache_resource skips cache_data's pickled copy
+@st.cache_resource(show_spinner=False)
+def slot_labels(start_h, end_h):
+    return tuple(f"{h:02d}:00" for h in range(start_h, end_h))
+
+def format_availability_df(bookings_df, start_date, days=7):
+    return _availability_grid(
+        bookings_df, start_date, days,
+        settings.operating_hours_start, settings.operating_hours_end, settings.court_count,
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _availability_grid(bookings_df, start_date, days, start_h, end_h, court_count):
+    dates = pd.date_range(start_date, periods=days)
+    times = slot_labels(start_h, end_h)
+    courts = range(1, court_count + 1)
+
+    # Booked cells in view only; a later row wins on a double booking
+    in_view = bookings_df["is_booked"] & bookings_df["date"].between(dates[0], dates[-1])
+    booked = pd.DataFrame({
+        "time": bookings_df.loc[in_view, "time_slot"].astype(str),
+        "court": bookings_df.loc[in_view, "court"].astype(int),
+        "date": bookings_df.loc[in_view, "date"],
+        "name": bookings_df.loc[in_view, "customer_name"].astype(str),
+    }).drop_duplicates(["time", "court", "date"], keep="last")
+    labels = "🔴 " + booked.set_index(["time", "court", "date"])["name"]
+
+    # Every other (slot, day) cell is filled in one reindex, then pivoted to days-as-columns
+    grid = (
+        labels.reindex(
+            pd.MultiIndex.from_product([times, courts, dates], names=["time", "court", "date"]),
+            fill_value="✅ Available",
+        )
+        .unstack("date")
+        .reindex(index=pd.MultiIndex.from_product([times, courts]), columns=dates)
+    )
+    grid.index = [f"Court {court} ({time_slot})" for time_slot, court in grid.index]
+    grid.columns = [d.strftime("%a %d/%m") for d in dates]
+    return grid.rename_axis("Slot").reset_index()
+
+_BOOKED_CELL_CSS = 'background-color: #fee2e2; color: #991b1b; font-weight: bold; border-left: 4px solid #ef4444;'
+_FREE_CELL_CSS = 'background-color: #f0fdf4; color: #166534; opacity: 0.9;'
+
+def color_cells(df):
+    """Cell styles for the whole grid at once (Styler.apply with axis=None)."""
+    values = df.astype(str)
+    booked = values.apply(lambda col: col.str.contains("🔴", regex=False))
+    free = values.apply(lambda col: col.str.contains("✅", regex=False))
+    css = np.where(booked, _BOOKED_CELL_CSS, np.where(free, _FREE_CELL_CSS, ""))
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def matrix_html(df, selected_day):
+    """Styled grid (all days or one) as static HTML, so reruns skip the Styler and Arrow serialization."""
+    all_days = selected_day == "View All Days (Desktop)"
+    # The Styler never mutates the frame: no copy
+    display_df = df if all_days else df[["Slot", selected_day]]
+    styler = (
+        display_df.style
+        # Customer names come from the public request sheet: escape before unsafe_allow_html
+        .format(escape="html")
+        .apply(color_cells, axis=None, subset=display_df.columns[1:])
+        .hide(axis="index")
+        .set_table_attributes('style="width: 100%; border-collapse: collapse;"')
+    )
+    height = 550 if all_days else 400
+    return f'<div style="max-height: {height}px; overflow: auto;">{styler.to_html()}</div>'
+
+def booking_counts(bookings_df, today):
+    """(booked today, dated today or later) as column operations."""
+    today_ts = pd.Timestamp(today)
+    dates = bookings_df["date"]
+    today_count = int(((dates == today_ts) & bookings_df["is_booked"]).sum())
+    return today_count, int((dates >= today_ts).sum())
+
+@st.cache_data(ttl=60, show_spinner=False)
+def registry_df(bookings_df):
+    # Low-cardinality columns stay categorical: counts and filters run on integer codes
+    return pd.DataFrame({
+        "Date": bookings_df["date"].dt.strftime("%Y-%m-%d"),
+        "Time": bookings_df["time_slot"],
+        "Court": bookings_df["court"].astype("category"),
+        "Customer": bookings_df["customer_name"],
+        "Phone": bookings_df["phone"],
+        "Status": bookings_df["status"],
+        "Notes": bookings_df["notes"],
+    })
+
+@st.cache_data(ttl=60, show_spinner=False)
+def analytics_figures(bookings_df):
+    """Time-slot and court charts over all booked rows; independent of the search box."""
+    # is_booked was derived from the status once, when the frame was built
+    reg_df = registry_df(bookings_df)
+    booked = reg_df[bookings_df['is_booked'].to_numpy()]
+    # Unused categories would show up as zero-count bars/slices
+    booked = booked.assign(
+        Time=booked['Time'].cat.remove_unused_categories(),
+        Court=booked['Court'].cat.remove_unused_categories(),
+    )
+    # Time slot popularity
+    time_counts = booked['Time'].value_counts().rename_axis('Time Slot').reset_index(name='Bookings')
+    fig_time = px.bar(time_counts, x='Time Slot', y='Bookings', title="Bookings by Time Slot", color_discrete_sequence=['#1e3a5f'])
+    # Court popularity
+    court_counts = booked['Court'].value_counts().rename_axis('Court').reset_index(name='Bookings')
+    fig_court = px.pie(court_counts, names='Court', values='Bookings', title="Court Utilization", hole=0.4)
+    return fig_time, fig_court
+
+# Reruns on its own when only the day selector changes (no-op decorator on older Streamlit)
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+@_fragment
+def availability_matrix(df):
+    selected_day = st.selectbox(
+        "📱 Mobile View: Select Day to Zoom In", 
+        ["View All Days (Desktop)"] + list(df.columns[1:]),
+        index=0
+    )
     
-    for h in range(start_h, end_h):
-        time_slot = f"{h:02d}:00"
-        for court in range(1, court_count + 1):
-            row = {"Slot": f"Court {court} ({time_slot})"}
-            for d in dates:
-                date_str = d.strftime("%Y-%m-%d")
-                col_name = d.strftime("%a %d/%m")
-                key = f"{date_str}_{time_slot}_{court}"
-                if key in lookup:
-                    row[col_name] = f"🔴 {lookup[key]}"
-                else:
-                    row[col_name] = "✅ Available"
-            data.append(row)
+    # Static status table: rendered once per grid and day, re-emitted from the cache
+    st.markdown(matrix_html(df, selected_day), unsafe_allow_html=True)
     
-    return pd.DataFrame(data)
+    st.caption("💡 Tip: Cell-phone users should select a specific day for the best experience.")
+
+# One clock reading per script run, shared by every section below
+now_taipei = get_taipei_now()
+today = now_taipei.date()
 
 # Sidebar
 with st.sidebar:
@@ -304,19 +423,19 @@ with st.sidebar:
     
     if st.button("🔄 Sync with Google Sheets", use_container_width=True):
         with st.spinner("Synchronizing data..."):
-            processed = booking_manager.process_requests()
-            booking_manager.refresh_cache()
+            # Registry + requests in one round-trip; picks up manual registry edits too
+            processed = booking_manager.sync_all()
             dashboard.update_dashboard()
             st.success(f"Synced! Processed {processed} requests.")
             st.rerun()
             
     st.divider()
     st.info("System Status: Online ✅")
-    st.caption(f"Last updated: {get_taipei_now().strftime('%H:%M:%S')}")
+    st.caption(f"Last updated: {now_taipei.strftime('%H:%M:%S')}")
 
 # Main Content
 # Professional Header with Status Badge
-st.markdown(f"""
+_HEADER_HTML = """
 <div style="background: linear-gradient(90deg, #1e3a8a 0%, #3b82f6 100%); padding: 2rem; border-radius: 24px; color: white; margin-bottom: 2rem; box-shadow: 0 10px 25px rgba(30, 58, 138, 0.2);">
     <div style="display: flex; align-items: center; justify-content: space-between; flex-wrap: wrap; gap: 1rem;">
         <div>
@@ -331,26 +450,29 @@ st.markdown(f"""
         </div>
     </div>
 </div>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+
+# One registry snapshot per run for every tab. The manager re-reads the sheet only after
+# its own writes or once cache_ttl_seconds have passed; Sync forces a re-read.
+bookings_df = booking_manager.get_bookings_df()
 
 tabs = st.tabs(["📊 DASHBOARD", "📝 NEW BOOKING", "⚙️ OPERATIONS"])
 
 # Tab 1: Dashboard
 with tabs[0]:
     # Custom Metrics with Premium Look
-    bookings = booking_manager.get_all_bookings()
-    today_str = get_taipei_now().strftime("%Y-%m-%d")
-    today_bookings = [b for b in bookings if b.date.strftime("%Y-%m-%d") == today_str and "Booked" in b.status]
+    today_count, upcoming_count = booking_counts(bookings_df, today)
     total_slots = (settings.operating_hours_end - settings.operating_hours_start) * settings.court_count
-    occupancy = (len(today_bookings) / total_slots) * 100 if total_slots > 0 else 0
+    occupancy = (today_count / total_slots) * 100 if total_slots > 0 else 0
     
     m1, m2, m3, m4 = st.columns(4)
     with m1:
-        st.metric("Today's Work", len(today_bookings), delta=f"{occupancy:.1f}% Use")
+        st.metric("Today's Work", today_count, delta=f"{occupancy:.1f}% Use")
     with m2:
         st.metric("Total Courts", settings.court_count)
     with m3:
-        st.metric("Upcoming", sum(1 for b in bookings if b.date.date() >= get_taipei_now().date()))
+        st.metric("Upcoming", upcoming_count)
     with m4:
         st.metric("Status", "Online", delta="Stable")
 
@@ -358,37 +480,7 @@ with tabs[0]:
     
     # MOBILE OPTIMIZATION: Day Selection
     st.markdown("### 🗓️ Availability Matrix")
-    
-    all_dates = [(get_taipei_now() + timedelta(days=i)).strftime("%a %d/%m") for i in range(7)]
-    selected_day = st.selectbox(
-        "📱 Mobile View: Select Day to Zoom In", 
-        ["View All Days (Desktop)"] + all_dates,
-        index=0
-    )
-    
-    df = format_availability_df(bookings)
-    
-    # Filter DF if a specific day is selected
-    display_df = df.copy()
-    if selected_day != "View All Days (Desktop)":
-        display_df = df[["Slot", selected_day]]
-
-    # Display table with formatting
-    def color_cells(val):
-        if "🔴" in str(val):
-            return 'background-color: #fee2e2; color: #991b1b; font-weight: bold; border-left: 4px solid #ef4444;'
-        elif "✅" in str(val):
-            return 'background-color: #f0fdf4; color: #166534; opacity: 0.9;'
-        return ''
-
-    st.dataframe(
-        display_df.style.applymap(color_cells, subset=display_df.columns[1:]),
-        height=550 if selected_day == "View All Days (Desktop)" else 400,
-        use_container_width=True,
-        hide_index=True
-    )
-    
-    st.caption("💡 Tip: Click 'Slot' headings to sort. Cell-phone users should select a specific day for the best experience.")
+    availability_matrix(format_availability_df(bookings_df, today))
 
 # Tab 2: Quick Booking
 with tabs[1]:
@@ -397,8 +489,8 @@ with tabs[1]:
     with st.form("booking_form", clear_on_submit=True):
         c1, c2 = st.columns(2)
         with c1:
-            date = st.date_input("Select Date", min_value=get_taipei_now().date(), max_value=get_taipei_now().date() + timedelta(days=settings.max_advance_days))
-            time_slot = st.selectbox("Select Time", [f"{h:02d}:00" for h in range(settings.operating_hours_start, settings.operating_hours_end)])
+            date = st.date_input("Select Date", min_value=today, max_value=today + timedelta(days=settings.max_advance_days))
+            time_slot = st.selectbox("Select Time", slot_labels(settings.operating_hours_start, settings.operating_hours_end))
             court = st.number_input("Court Number", min_value=1, max_value=settings.court_count, value=1)
         
         with c2:
@@ -428,8 +520,7 @@ with tabs[1]:
                 success, msg, _ = booking_manager.create_booking(new_booking)
                 if success:
                     st.success(f"✅ Booking Confirmed: {name} at {time_slot} (Court {court})")
-                    # Update local cache and dashboard
-                    booking_manager.refresh_cache()
+                    # create_booking already added it to the local cache: just re-render
                     dashboard.update_dashboard()
                 else:
                     st.error(f"❌ Failed: {msg}")
@@ -438,45 +529,35 @@ with tabs[1]:
 with tabs[2]:
     st.markdown("### 📋 Booking Registry")
     
-    search = st.text_input("Search (Name, Phone, or Court)", "")
+    # Inside a form the query only triggers a rerun on submit, not on every edit
+    with st.form("registry_search"):
+        search = st.text_input("Search (Name, Phone, or Court)", "")
+        st.form_submit_button("🔍 Search")
     
-    # 1. Populate Registry Data first
-    reg_data = []
-    for b in bookings:
-        if search.lower() in b.customer_name.lower() or search in b.phone or search in str(b.court):
-            reg_data.append({
-                "Date": b.date.strftime("%Y-%m-%d"),
-                "Time": b.time_slot,
-                "Court": b.court,
-                "Customer": b.customer_name,
-                "Phone": b.phone,
-                "Status": b.status,
-                "Notes": b.notes
-            })
-
-    # 2. Analytics Section (using reg_data)
+    # 1. Populate Registry Data first (cached per registry snapshot)
+    all_df = registry_df(bookings_df)
+
+    # 2. Analytics Section: whole registry, so typing in the search box reuses the figures
     st.markdown("#### 📈 Utilization Analytics")
-    if reg_data:
-        import plotly.express as px
-        reg_df = pd.DataFrame(reg_data)
-        
+    if not all_df.empty:
+        fig_time, fig_court = analytics_figures(bookings_df)
         c1, c2 = st.columns(2)
         with c1:
-            # Time slot popularity
-            time_counts = reg_df[reg_df['Status'].str.contains("Booked")]['Time'].value_counts().reset_index()
-            time_counts.columns = ['Time Slot', 'Bookings']
-            fig_time = px.bar(time_counts, x='Time Slot', y='Bookings', title="Bookings by Time Slot", color_discrete_sequence=['#1e3a5f'])
             st.plotly_chart(fig_time, use_container_width=True)
-            
         with c2:
-            # Court popularity
-            court_counts = reg_df[reg_df['Status'].str.contains("Booked")]['Court'].value_counts().reset_index()
-            court_counts.columns = ['Court', 'Bookings']
-            fig_court = px.pie(court_counts, names='Court', values='Bookings', title="Court Utilization", hole=0.4)
             st.plotly_chart(fig_court, use_container_width=True)
 
-    if reg_data:
-        st.dataframe(pd.DataFrame(reg_data), use_container_width=True, hide_index=True)
+    # 3. The search only filters the table, in pandas
+    reg_df = all_df
+    if search:
+        reg_df = reg_df[
+            reg_df["Customer"].str.contains(search, case=False, regex=False, na=False)
+            | reg_df["Phone"].str.contains(search, regex=False, na=False)
+            | reg_df["Court"].astype(str).str.contains(search, regex=False)
+        ]
+
+    if not reg_df.empty:
+        st.dataframe(reg_df, use_container_width=True, hide_index=True)
     else:
         st.write("No matching records found.")
 
@@ -0,0 +1,146 @@
+"""BookingManager request batches against an in-memory stand-in for SheetsClient."""
+
+import pytest
+
+from src.booking_manager import BookingManager
+from src.config import get_settings
+
+settings = get_settings()
+
+
+class FakeSheetsClient:
+    """Keeps the registry and the requests sheet as row lists; records every write."""
+
+    def __init__(self, registry=None, requests=None):
+        self.registry = [list(row) for row in registry or []]
+        self.requests = [list(row) for row in requests or []]
+        self.fail = set()  # "appends" and/or "cancels": make that batch call raise
+        self.appended = []
+        self.cancelled_ranges = []
+        self.statuses = {}  # requests sheet row -> BOOKING_STATUS written
+
+    def _rows(self, range_name):
+        if range_name.startswith(f"'{settings.bookings_sheet_name}'"):
+            return self.registry
+        return self.requests
+
+    def read_range(self, range_name, fresh=False):
+        return [list(row) for row in self._rows(range_name)]
+
+    def read_ranges(self, ranges):
+        return {r: self.read_range(r) for r in ranges}
+
+    def write_ranges(self, data, value_input_option="RAW"):
+        if "cancels" in self.fail:
+            raise RuntimeError("cancel write failed")
+        for range_name, values in data.items():
+            row = int(range_name.rsplit("G", 1)[1])
+            self.registry[row - 2][6] = values[0][0]
+            self.cancelled_ranges.append(range_name)
+        return True
+
+    def append_rows(self, range_name, rows):
+        if "appends" in self.fail:
+            raise RuntimeError("append failed")
+        first_row = len(self.registry) + 2
+        self.registry.extend(list(row) for row in rows)
+        self.appended.extend(rows)
+        return first_row
+
+    def update_column(self, sheet_name, col_letter, start_row, values):
+        for offset, (status,) in enumerate(values):
+            self.statuses[start_row + offset] = status
+        return True
+
+
+def _registry_row(date, time_slot, court, name, created_at="2024-01-01 10:00:00"):
+    return [date, time_slot, str(court), name, "0900", "a@b.c", "🔴 Booked", created_at, ""]
+
+
+def _request(action, date, time_slot, court, name):
+    return [action, date, time_slot, str(court), name, "0900", "a@b.c", ""]
+
+
+@pytest.fixture
+def make_manager():
+    def make(registry=None, requests=None):
+        client = FakeSheetsClient(registry, requests)
+        return BookingManager(client), client
+    return make
+
+
+def test_booking_and_its_cancel_in_one_batch_append_one_cancelled_row(make_manager):
+    manager, client = make_manager(requests=[
+        _request("🆕 BOOKING", "2030-01-02", "10:00", 1, "Bob"),
+        _request("🚫 CANCEL", "2030-01-02", "10:00", 1, "Bob"),
+    ])
+
+    assert manager.sync_all() == 2
+
+    assert client.statuses == {2: "✅ BOOKED", 3: "✅ CANCELLED"}
+    # The cancel rides on the append: one row, already cancelled, no status write
+    assert len(client.appended) == 1
+    assert client.appended[0][6] == "⚪ Cancelled"
+    assert client.cancelled_ranges == []
+    assert manager.check_availability(manager.get_all_bookings()[0].date, "10:00", 1)
+
+
+def test_second_request_for_a_slot_in_the_same_batch_is_rejected(make_manager):
+    manager, client = make_manager(requests=[
+        _request("🆕 BOOKING", "2030-01-02", "10:00", 1, "Bob"),
+        _request("🆕 BOOKING", "2030-01-02", "10:00", 1, "Carol"),
+    ])
+
+    assert manager.sync_all() == 1
+
+    assert client.statuses == {2: "✅ BOOKED", 3: "❌ ALREADY RESERVED"}
+    assert [row[3] for row in client.appended] == ["Bob"]
+
+
+def test_existing_booking_with_unpadded_created_at_still_blocks_its_slot(make_manager):
+    manager, client = make_manager(
+        registry=[_registry_row("2030-01-02", "09:00", 1, "Alice", created_at="2024-01-05 9:05:03")],
+        requests=[_request("🆕 BOOKING", "2030-01-02", "09:00", 1, "Carol")],
+    )
+
+    assert manager.sync_all() == 0
+
+    assert client.statuses == {2: "❌ ALREADY RESERVED"}
+    assert client.appended == []
+
+
+def test_failed_append_relabels_only_the_bookings(make_manager):
+    manager, client = make_manager(
+        registry=[_registry_row("2030-01-02", "09:00", 1, "Alice")],
+        requests=[
+            _request("🆕 BOOKING", "2030-01-02", "10:00", 1, "Bob"),
+            _request("🚫 CANCEL", "2030-01-02", "09:00", 1, "Alice"),
+        ],
+    )
+    client.fail.add("appends")
+
+    assert manager.sync_all() == 1
+
+    assert client.statuses[2] == "❌ DB ERROR: append failed"
+    # The cancellation's own write went through
+    assert client.statuses[3] == "✅ CANCELLED"
+    assert client.registry[0][6] == "⚪ Cancelled"
+    # The cache shows a booking the sheet does not have: the next read goes to the sheet
+    assert manager._cache_dirty
+
+
+def test_failed_cancel_write_relabels_only_the_cancellations(make_manager):
+    manager, client = make_manager(
+        registry=[_registry_row("2030-01-02", "09:00", 1, "Alice")],
+        requests=[
+            _request("🆕 BOOKING", "2030-01-02", "10:00", 1, "Bob"),
+            _request("🚫 CANCEL", "2030-01-02", "09:00", 1, "Alice"),
+        ],
+    )
+    client.fail.add("cancels")
+
+    assert manager.sync_all() == 1
+
+    assert client.statuses == {2: "✅ BOOKED", 3: "❌ DB ERROR: cancel write failed"}
+    assert [row[3] for row in client.appended] == ["Bob"]
+    assert client.registry[0][6] == "🔴 Booked"
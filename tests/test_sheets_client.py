@@ -0,0 +1,87 @@
+"""SheetsClient retry/backoff behaviour, with the API requests replaced by stubs."""
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import src.sheets_client as sheets_client
+from src.sheets_client import SheetsClient
+
+
+class FlakyRequest:
+    """Raises the queued HTTP statuses in turn, then returns `result`."""
+
+    def __init__(self, *failures, result=None):
+        self.failures = list(failures)
+        self.result = result if result is not None else {"ok": True}
+        self.calls = 0
+
+    def execute(self, http=None):
+        self.calls += 1
+        if self.failures:
+            status, headers = self.failures.pop(0)
+            resp = httplib2.Response({"status": status, **headers})
+            raise HttpError(resp, b"{}")
+        return self.result
+
+
+@pytest.fixture
+def client(monkeypatch, mocker):
+    monkeypatch.setattr(SheetsClient, "_authenticate", lambda self, creds: mocker.MagicMock())
+    monkeypatch.setattr(SheetsClient, "_thread_http", lambda self: None)
+    return SheetsClient(credentials_path={}, sheet_id="test-sheet")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    monkeypatch.setattr(sheets_client.time, "sleep", waits.append)
+    return waits
+
+
+def test_transient_errors_are_retried_with_jittered_backoff(client, sleeps):
+    request = FlakyRequest((503, {}), (500, {}))
+
+    assert client._execute_with_retry(request) == {"ok": True}
+
+    assert request.calls == 3
+    # 2**attempt seconds, scaled by a jitter factor in [0.5, 1.5)
+    assert 0.5 <= sleeps[0] < 1.5
+    assert 1.0 <= sleeps[1] < 3.0
+
+
+def test_retry_after_header_sets_the_wait(client, sleeps):
+    request = FlakyRequest((429, {"retry-after": "7"}))
+
+    client._execute_with_retry(request)
+
+    assert sleeps == [7.0]
+
+
+def test_retry_after_is_capped(client, sleeps):
+    request = FlakyRequest((429, {"retry-after": "3600"}))
+
+    client._execute_with_retry(request)
+
+    assert sleeps == [sheets_client._MAX_BACKOFF_SECONDS]
+
+
+def test_non_retryable_status_raises_at_once(client, sleeps):
+    request = FlakyRequest((404, {}))
+
+    with pytest.raises(HttpError):
+        client._execute_with_retry(request)
+
+    assert request.calls == 1
+    assert sleeps == []
+
+
+def test_last_error_propagates_after_max_retries(client, sleeps):
+    request = FlakyRequest(*[(503, {})] * 5)
+
+    with pytest.raises(HttpError) as excinfo:
+        client._execute_with_retry(request, max_retries=2)
+
+    assert excinfo.value.resp.status == 503
+    assert request.calls == 3
+    assert len(sleeps) == 2